@@ -3,6 +3,7 @@
 import asyncio
 import json
 import time
+from collections.abc import AsyncIterator, Callable
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -14,7 +15,7 @@ from nanobot.metrics.models import ToolEvent, LLMEvent, SessionSummary
 
 from nanobot.bus.events import InboundMessage, OutboundMessage
 from nanobot.bus.queue import MessageBus
-from nanobot.providers.base import LLMProvider
+from nanobot.providers.base import LLMProvider, LLMResponse, ToolCallRequest
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.tools.registry import ToolRegistry
 from nanobot.agent.tools.filesystem import ReadFileTool, WriteFileTool, EditFileTool, ListDirTool
@@ -54,6 +55,7 @@ class AgentLoop:
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        metrics_sampling: str = "full",
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
@@ -70,7 +72,7 @@ class AgentLoop:
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
 
-        self.collector = MetricsCollector()
+        self.collector = MetricsCollector(sampling=metrics_sampling)
         self.context = ContextBuilder(workspace)
         self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
@@ -154,8 +156,77 @@ class AgentLoop:
         self._running = False
         logger.info("Agent loop stopping")
 
+    async def _call_llm(
+        self,
+        messages: list[dict[str, Any]],
+        on_delta: Callable[[str], None] | None = None,
+    ) -> LLMResponse:
+        """
+        Call the LLM, forwarding content deltas to ``on_delta`` as they arrive.
+
+        Without ``on_delta`` (or when the provider cannot stream) this is a plain
+        ``provider.chat`` call; streamed chunks are assembled into the same
+        LLMResponse shape.  A failed stream returns an error response, as
+        ``provider.chat`` does, instead of raising or retrying.
+        """
+        tools = self.tools.get_definitions()
+        if on_delta is None:
+            return await self.provider.chat(messages=messages, tools=tools, model=self.model)
+
+        content_parts: list[str] = []
+        reasoning_parts: list[str] = []
+        tool_names: dict[str, str] = {}
+        tool_args: dict[str, list[str]] = {}  # call id -> partial arguments JSON
+        finish_reason = "stop"
+        usage: dict[str, int] = {}
+        try:
+            async for chunk in self.provider.stream_chat(
+                messages=messages, tools=tools, model=self.model
+            ):
+                if chunk.content_delta:
+                    content_parts.append(chunk.content_delta)
+                    on_delta(chunk.content_delta)
+                if chunk.reasoning_delta:
+                    reasoning_parts.append(chunk.reasoning_delta)
+                for delta in chunk.tool_calls_delta:
+                    if delta.name:
+                        tool_names[delta.id] = delta.name
+                    tool_args.setdefault(delta.id, []).append(delta.arguments_json)
+                if chunk.finish_reason:
+                    finish_reason = chunk.finish_reason
+                if chunk.usage:
+                    usage = chunk.usage
+        except Exception as e:
+            if isinstance(e, NotImplementedError) and not (content_parts or tool_args):
+                return await self.provider.chat(messages=messages, tools=tools, model=self.model)
+            # Same shape as a failed provider.chat(); retrying would repeat the
+            # request (e.g. after a rate limit) and duplicate streamed text.
+            logger.error(f"Streaming LLM call failed: {e}")
+            return LLMResponse(content=f"Error calling LLM: {e}", finish_reason="error")
+
+        tool_calls = []
+        for call_id, arg_parts in tool_args.items():
+            try:
+                arguments = json.loads("".join(arg_parts) or "{}")
+            except json.JSONDecodeError:
+                arguments = {}
+            tool_calls.append(
+                ToolCallRequest(id=call_id, name=tool_names.get(call_id, ""), arguments=arguments)
+            )
+
+        return LLMResponse(
+            content="".join(content_parts) or None,
+            tool_calls=tool_calls,
+            finish_reason=finish_reason,
+            usage=usage,
+            reasoning_content="".join(reasoning_parts) or None,
+        )
+
     async def _process_message(
-        self, msg: InboundMessage, session_key: str | None = None
+        self,
+        msg: InboundMessage,
+        session_key: str | None = None,
+        on_delta: Callable[[str], None] | None = None,
     ) -> OutboundMessage | None:
         """
         Process a single inbound message.
@@ -163,6 +234,7 @@ class AgentLoop:
         Args:
             msg: The inbound message to process.
             session_key: Override session key (used by process_direct).
+            on_delta: Optional callback receiving response text as it streams in.
 
         Returns:
             The response message, or None if no response needed.
@@ -238,9 +310,7 @@ class AgentLoop:
 
             # Call LLM (with timing)
             llm_start = time.monotonic()
-            response = await self.provider.chat(
-                messages=messages, tools=self.tools.get_definitions(), model=self.model
-            )
+            response = await self._call_llm(messages, on_delta)
             llm_latency = int((time.monotonic() - llm_start) * 1000)
             total_llm_calls += 1
 
@@ -317,6 +387,9 @@ class AgentLoop:
                     messages = self.context.add_tool_result(
                         messages, tool_call.id, tool_call.name, result
                     )
+                # Separate streamed narration from the next iteration's text
+                if on_delta and response.content:
+                    on_delta("\n\n")
                 # Interleaved CoT: reflect before next action
                 messages.append(
                     {"role": "user", "content": "Reflect on the results and decide next steps."}
@@ -607,3 +680,52 @@ Respond with ONLY valid JSON, no markdown fences."""
 
         response = await self._process_message(msg, session_key=session_key)
         return response.content if response else ""
+
+    async def stream_direct(
+        self,
+        content: str,
+        session_key: str = "cli:direct",
+        channel: str = "cli",
+        chat_id: str = "direct",
+    ) -> AsyncIterator[str]:
+        """
+        Process a message directly, yielding response text as it is generated.
+
+        Text produced in tool-calling iterations is streamed as well. When the
+        final response was not streamed (provider without streaming support,
+        slash commands, iteration limit), it is yielded as one chunk at the end.
+
+        Args:
+            content: The message content.
+            session_key: Session identifier (overrides channel:chat_id for session lookup).
+            channel: Source channel (for tool context routing).
+            chat_id: Source chat ID (for tool context routing).
+
+        Yields:
+            Chunks of the agent's response text.
+        """
+        msg = InboundMessage(channel=channel, sender_id="user", chat_id=chat_id, content=content)
+        queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def _run() -> OutboundMessage | None:
+            try:
+                return await self._process_message(
+                    msg, session_key=session_key, on_delta=queue.put_nowait
+                )
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(_run())
+        streamed: list[str] = []
+        try:
+            while (delta := await queue.get()) is not None:
+                streamed.append(delta)
+                yield delta
+            response = await task
+        finally:
+            if not task.done():
+                task.cancel()
+
+        final = response.content if response else ""
+        if final and not "".join(streamed).endswith(final):
+            yield f"\n{final}" if streamed else final
@@ -1,25 +1,25 @@
 """CLI commands for nanobot."""
 
+from __future__ import annotations
+
 import asyncio
+import functools
 import os
-import signal
 from pathlib import Path
-import select
 import sys
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
 
 import typer
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.table import Table
 from rich.text import Text
 
-from prompt_toolkit import PromptSession
-from prompt_toolkit.formatted_text import HTML
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.patch_stdout import patch_stdout
-
 from nanobot import __version__, __logo__
 
+if TYPE_CHECKING:
+    # prompt_toolkit is only imported once interactive mode actually starts
+    from prompt_toolkit import PromptSession
+
 app = typer.Typer(
     name="nanobot",
     help=f"{__logo__} nanobot - Personal AI Assistant",
@@ -27,7 +27,8 @@ app = typer.Typer(
 )
 
 console = Console()
-EXIT_COMMANDS = {"exit", "quit", "/exit", "/quit", ":q"}
+EXIT_COMMANDS = frozenset(c.casefold() for c in ("exit", "quit", "/exit", "/quit", ":q"))
+_EXIT_MAX_LEN = max(len(c) for c in EXIT_COMMANDS)
 
 # ---------------------------------------------------------------------------
 # CLI input: prompt_toolkit for editing, paste, history, and display
@@ -35,65 +36,104 @@ EXIT_COMMANDS = {"exit", "quit", "/exit", "/quit", ":q"}
 
 _PROMPT_SESSION: PromptSession | None = None
 _SAVED_TERM_ATTRS = None  # original termios settings, restored on exit
+_STDIN_FD: int | None = None  # stdin file descriptor, cached once
+_STDIN_IS_TTY: bool | None = None  # set by _init_stdin_state() at import
+_TERMIOS = None  # termios module, None where unavailable (e.g. Windows)
 
 
-def _flush_pending_tty_input() -> None:
-    """Drop unread keypresses typed while the model was generating output."""
+def _init_stdin_state() -> None:
+    """Cache the stdin descriptor, its TTY status and the termios module."""
+    global _STDIN_FD, _STDIN_IS_TTY, _TERMIOS
+
     try:
-        fd = sys.stdin.fileno()
-        if not os.isatty(fd):
-            return
+        _STDIN_FD = sys.stdin.fileno()
+        _STDIN_IS_TTY = os.isatty(_STDIN_FD)
     except Exception:
-        return
+        _STDIN_FD = None
+        _STDIN_IS_TTY = False
 
     try:
         import termios
 
-        termios.tcflush(fd, termios.TCIFLUSH)
-        return
+        _TERMIOS = termios
+    except ImportError:
+        _TERMIOS = None
+
+
+# Capture the terminal state once at import, before any library mutates the TTY
+_init_stdin_state()
+if _STDIN_IS_TTY and _TERMIOS is not None:
+    try:
+        _SAVED_TERM_ATTRS = _TERMIOS.tcgetattr(_STDIN_FD)
     except Exception:
         pass
 
+
+def _flush_pending_tty_input() -> None:
+    """Drop unread keypresses typed while the model was generating output."""
+    if not _STDIN_IS_TTY:
+        return
+    fd = _STDIN_FD
+
+    if _TERMIOS is not None:
+        # Cheap probe first: skip the flush when no bytes are waiting
+        try:
+            import array
+            import fcntl
+
+            pending = array.array("i", [0])
+            fcntl.ioctl(fd, _TERMIOS.FIONREAD, pending, True)
+            if pending[0] == 0:
+                return
+        except Exception:
+            pass
+        try:
+            _TERMIOS.tcflush(fd, _TERMIOS.TCIFLUSH)
+            return
+        except Exception:
+            pass
+
+    # Fallback: switch stdin to non-blocking and drain it until empty
     try:
-        while True:
-            ready, _, _ = select.select([fd], [], [], 0)
-            if not ready:
-                break
-            if not os.read(fd, 4096):
-                break
+        import fcntl
+
+        flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
     except Exception:
         return
+    try:
+        while os.read(fd, 65536):
+            pass
+    except OSError:
+        pass
+    finally:
+        fcntl.fcntl(fd, fcntl.F_SETFL, flags)
 
 
 def _restore_terminal() -> None:
     """Restore terminal to its original state (echo, line buffering, etc.)."""
-    if _SAVED_TERM_ATTRS is None:
+    if _SAVED_TERM_ATTRS is None or _TERMIOS is None:
         return
     try:
-        import termios
-
-        termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, _SAVED_TERM_ATTRS)
+        _TERMIOS.tcsetattr(_STDIN_FD, _TERMIOS.TCSANOW, _SAVED_TERM_ATTRS)
     except Exception:
         pass
 
 
 def _init_prompt_session() -> None:
     """Create the prompt_toolkit session with persistent file history."""
-    global _PROMPT_SESSION, _SAVED_TERM_ATTRS
-
-    # Save terminal state so we can restore it on exit
-    try:
-        import termios
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory, ThreadedHistory
 
-        _SAVED_TERM_ATTRS = termios.tcgetattr(sys.stdin.fileno())
-    except Exception:
-        pass
+    global _PROMPT_SESSION
 
     history_file = Path.home() / ".nanobot" / "history" / "cli_history"
     history_file.parent.mkdir(parents=True, exist_ok=True)
 
     _PROMPT_SESSION = PromptSession(
-        history=FileHistory(str(history_file)),
+        # History file I/O runs in a worker thread, off the prompt's event loop
+        history=ThreadedHistory(FileHistory(str(history_file))),
+        enable_history_search=True,
         enable_open_in_editor=False,
         multiline=False,  # Enter submits (single line mode)
     )
@@ -101,17 +141,43 @@ def _init_prompt_session() -> None:
 
 def _print_agent_response(response: str, render_markdown: bool) -> None:
     """Render assistant response with consistent terminal styling."""
+    from rich.console import Group
+    from rich.markdown import Markdown
+
     content = response or ""
     body = Markdown(content) if render_markdown else Text(content)
+    # One print call renders and writes the whole block in a single pass
+    console.print(Group(Text(""), Text(f"{__logo__} nanobot", style="cyan"), body, Text("")))
+
+
+async def _print_agent_stream(
+    first: str | None, stream: AsyncIterator[str], render_markdown: bool
+) -> None:
+    """Render a streamed assistant response as it arrives."""
+    from rich.live import Live
+    from rich.markdown import Markdown
+
     console.print()
-    console.print(f"[cyan]{__logo__} nanobot[/cyan]")
-    console.print(body)
+    console.print(Text(f"{__logo__} nanobot", style="cyan"))
+    buf = first or ""
+    if render_markdown:
+        # Live repaints at a capped rate rather than once per token
+        with Live(Markdown(buf), console=console, refresh_per_second=15) as live:
+            async for chunk in stream:
+                buf += chunk
+                live.update(Markdown(buf))
+    else:
+        console.print(buf, end="", soft_wrap=True, markup=False, highlight=False)
+        async for chunk in stream:
+            console.print(chunk, end="", soft_wrap=True, markup=False, highlight=False)
+        console.print()
     console.print()
 
 
 def _is_exit_command(command: str) -> bool:
     """Return True when input should end interactive chat."""
-    return command.lower() in EXIT_COMMANDS
+    # Length check first so long pasted input is never case-folded
+    return len(command) <= _EXIT_MAX_LEN and command.casefold() in EXIT_COMMANDS
 
 
 async def _read_interactive_input_async() -> str:
@@ -122,13 +188,14 @@ async def _read_interactive_input_async() -> str:
     - History navigation (up/down arrows)
     - Clean display (no ghost characters or artifacts)
     """
+    from prompt_toolkit.formatted_text import HTML
+
     if _PROMPT_SESSION is None:
         raise RuntimeError("Call _init_prompt_session() first")
     try:
-        with patch_stdout():
-            return await _PROMPT_SESSION.prompt_async(
-                HTML("<b fg='ansiblue'>You:</b> "),
-            )
+        return await _PROMPT_SESSION.prompt_async(
+            HTML("<b fg='ansiblue'>You:</b> "),
+        )
     except EOFError as exc:
         raise KeyboardInterrupt from exc
 
@@ -228,20 +295,7 @@ Information about the user goes here.
 - Timezone: (your timezone)
 - Language: (your preferred language)
 """,
-    }
-
-    for filename, content in templates.items():
-        file_path = workspace / filename
-        if not file_path.exists():
-            file_path.write_text(content)
-            console.print(f"  [dim]Created {filename}[/dim]")
-
-    # Create memory directory and MEMORY.md
-    memory_dir = workspace / "memory"
-    memory_dir.mkdir(exist_ok=True)
-    memory_file = memory_dir / "MEMORY.md"
-    if not memory_file.exists():
-        memory_file.write_text("""# Long-term Memory
+        "memory/MEMORY.md": """# Long-term Memory
 
 This file stores important information that should persist across sessions.
 
@@ -256,17 +310,51 @@ This file stores important information that should persist across sessions.
 ## Important Notes
 
 (Things to remember)
-""")
-        console.print("  [dim]Created memory/MEMORY.md[/dim]")
+""",
+        "memory/HISTORY.md": "",
+    }
 
-    history_file = memory_dir / "HISTORY.md"
-    if not history_file.exists():
-        history_file.write_text("")
-        console.print("  [dim]Created memory/HISTORY.md[/dim]")
+    pending = [(name, workspace / name, content) for name, content in templates.items()]
+    pending = [item for item in pending if not item[1].exists()]
 
-    # Create skills directory for custom user skills
-    skills_dir = workspace / "skills"
-    skills_dir.mkdir(exist_ok=True)
+    # Create every directory in one pass (skills/ holds custom user skills)
+    dirs = {path.parent for _, path, _ in pending} | {workspace / "memory", workspace / "skills"}
+    for d in dirs:
+        d.mkdir(parents=True, exist_ok=True)
+
+    # The writes are independent small files; issue them concurrently
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda item: item[1].write_text(item[2]), pending))
+
+    for name, _, _ in pending:
+        console.print(f"  [dim]Created {name}[/dim]")
+
+
+@functools.lru_cache(maxsize=1)
+def _config_cached():
+    """Load the user config once per CLI process."""
+    from nanobot.config.loader import load_config
+
+    return load_config()
+
+
+@functools.lru_cache(maxsize=1)
+def _cron_service():
+    """Return the CronService for the default jobs store, created once per process."""
+    from nanobot.config.loader import get_data_dir
+    from nanobot.cron.service import CronService
+
+    return CronService(get_data_dir() / "cron" / "jobs.json")
+
+
+@functools.lru_cache(maxsize=1)
+def _auth_manager():
+    """Return the Antigravity auth manager, shared by every caller in this process."""
+    from nanobot.providers.antigravity.auth import AntigravityAuthManager
+
+    return AntigravityAuthManager()
 
 
 def _make_provider(config):
@@ -276,15 +364,15 @@ def _make_provider(config):
     # Antigravity OAuth provider (no API key needed)
     ag = config.providers.antigravity
     if ag.enabled:
-        from nanobot.providers.antigravity.auth import AntigravityAuthManager
         from nanobot.providers.antigravity.provider import AntigravityProvider
 
-        auth = AntigravityAuthManager()
+        auth = _auth_manager()
         if auth.is_authenticated:
             return AntigravityProvider(
                 auth_manager=auth,
                 endpoint=ag.endpoint or None,
                 default_model=model,
+                prewarm_fallbacks=ag.prewarm_fallbacks,
             )
         else:
             console.print(
@@ -320,12 +408,10 @@ def gateway(
     verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
 ):
     """Start the nanobot gateway."""
-    from nanobot.config.loader import load_config, get_data_dir
     from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
     from nanobot.session.manager import SessionManager
-    from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
 
@@ -336,14 +422,13 @@ def gateway(
 
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
 
-    config = load_config()
+    config = _config_cached()
     bus = MessageBus()
     provider = _make_provider(config)
     session_manager = SessionManager(config.workspace_path)
 
     # Create cron service first (callback set after agent creation)
-    cron_store_path = get_data_dir() / "cron" / "jobs.json"
-    cron = CronService(cron_store_path)
+    cron = _cron_service()
 
     # Create agent with cron service
     agent = AgentLoop(
@@ -354,6 +439,7 @@ def gateway(
         agent_model=config.models.agent_model,
         max_iterations=config.agents.defaults.max_tool_iterations,
         memory_window=config.agents.defaults.memory_window,
+        metrics_sampling=config.agents.defaults.metrics_sampling,
         brave_api_key=config.tools.web.search.api_key or None,
         exec_config=config.tools.exec,
         cron_service=cron,
@@ -433,6 +519,38 @@ def gateway(
 # ============================================================================
 
 
+@functools.lru_cache(maxsize=1)
+def _agent_loop():
+    """Build the CLI AgentLoop once per process (config and provider included)."""
+    from nanobot.bus.queue import MessageBus
+    from nanobot.agent.loop import AgentLoop
+
+    config = _config_cached()
+    return AgentLoop(
+        bus=MessageBus(),
+        provider=_make_provider(config),
+        workspace=config.workspace_path,
+        model=config.models.main,
+        agent_model=config.models.agent_model,
+        max_iterations=config.agents.defaults.max_tool_iterations,
+        memory_window=config.agents.defaults.memory_window,
+        metrics_sampling=config.agents.defaults.metrics_sampling,
+        brave_api_key=config.tools.web.search.api_key or None,
+        exec_config=config.tools.exec,
+        restrict_to_workspace=config.tools.restrict_to_workspace,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _runner() -> asyncio.Runner:
+    """Event loop runner shared by every agent turn in this process; closed at exit."""
+    import atexit
+
+    runner = asyncio.Runner()
+    atexit.register(runner.close)
+    return runner
+
+
 @app.command()
 def agent(
     message: str = typer.Option(None, "--message", "-m", help="Message to send to the agent"),
@@ -445,33 +563,14 @@ def agent(
     ),
 ):
     """Interact with the agent directly."""
-    from nanobot.config.loader import load_config
-    from nanobot.bus.queue import MessageBus
-    from nanobot.agent.loop import AgentLoop
     from loguru import logger
 
-    config = load_config()
-
-    bus = MessageBus()
-    provider = _make_provider(config)
-
     if logs:
         logger.enable("nanobot")
     else:
         logger.disable("nanobot")
 
-    agent_loop = AgentLoop(
-        bus=bus,
-        provider=provider,
-        workspace=config.workspace_path,
-        model=config.models.main,
-        agent_model=config.models.agent_model,
-        max_iterations=config.agents.defaults.max_tool_iterations,
-        memory_window=config.agents.defaults.memory_window,
-        brave_api_key=config.tools.web.search.api_key or None,
-        exec_config=config.tools.exec,
-        restrict_to_workspace=config.tools.restrict_to_workspace,
-    )
+    agent_loop = _agent_loop()
 
     # Show spinner when logs are off (no output to miss); skip when logs are on
     def _thinking_ctx():
@@ -485,11 +584,13 @@ def agent(
     if message:
         # Single message mode
         async def run_once():
+            stream = agent_loop.stream_direct(message, session_id)
+            # Keep the spinner up until the first chunk, then render as it streams
             with _thinking_ctx():
-                response = await agent_loop.process_direct(message, session_id)
-            _print_agent_response(response, render_markdown=markdown)
+                first = await anext(stream, None)
+            await _print_agent_stream(first, stream, render_markdown=markdown)
 
-        asyncio.run(run_once())
+        _runner().run(run_once())
     else:
         # Interactive mode
         _init_prompt_session()
@@ -497,40 +598,46 @@ def agent(
             f"{__logo__} Interactive mode (type [bold]exit[/bold] or [bold]Ctrl+C[/bold] to quit)\n"
         )
 
-        def _exit_on_sigint(signum, frame):
-            _restore_terminal()
-            console.print("\nGoodbye!")
-            os._exit(0)
-
-        signal.signal(signal.SIGINT, _exit_on_sigint)
-
         async def run_interactive():
-            while True:
-                try:
-                    _flush_pending_tty_input()
-                    user_input = await _read_interactive_input_async()
-                    command = user_input.strip()
-                    if not command:
-                        continue
-
-                    if _is_exit_command(command):
+            from prompt_toolkit.patch_stdout import patch_stdout
+
+            # Keypresses only pile up while the agent is generating, so flush the
+            # TTY buffer once per finished response instead of before every prompt.
+            pending_flush = True
+
+            # Install the stdout proxy once for the whole session rather than per
+            # prompt; raw=True lets Rich's ANSI styling pass through untouched.
+            with patch_stdout(raw=True):
+                while True:
+                    try:
+                        if pending_flush:
+                            _flush_pending_tty_input()
+                            pending_flush = False
+                        user_input = await _read_interactive_input_async()
+                        command = user_input.strip()
+                        if not command:
+                            continue
+
+                        if _is_exit_command(command):
+                            _restore_terminal()
+                            console.print("\nGoodbye!")
+                            break
+
+                        with _thinking_ctx():
+                            response = await agent_loop.process_direct(user_input, session_id)
+                        pending_flush = True
+                        _print_agent_response(response, render_markdown=markdown)
+                    except (KeyboardInterrupt, EOFError, asyncio.CancelledError):
+                        # Ctrl+C at the prompt raises KeyboardInterrupt; during
+                        # generation the runner cancels this task instead
                         _restore_terminal()
                         console.print("\nGoodbye!")
                         break
 
-                    with _thinking_ctx():
-                        response = await agent_loop.process_direct(user_input, session_id)
-                    _print_agent_response(response, render_markdown=markdown)
-                except KeyboardInterrupt:
-                    _restore_terminal()
-                    console.print("\nGoodbye!")
-                    break
-                except EOFError:
-                    _restore_terminal()
-                    console.print("\nGoodbye!")
-                    break
-
-        asyncio.run(run_interactive())
+        try:
+            _runner().run(run_interactive())
+        except KeyboardInterrupt:
+            pass  # re-raised by the runner after a cancelled turn; already handled
 
 
 # ============================================================================
@@ -541,65 +648,162 @@ def agent(
 channels_app = typer.Typer(help="Manage channels")
 app.add_typer(channels_app, name="channels")
 
+_NOT_CONFIGURED = "[dim]not configured[/dim]"
+
+# (label, config attribute, configuration summary) rows for `channels status`
+_CHANNEL_SPECS = (
+    ("WhatsApp", "whatsapp", lambda c: c.bridge_url),
+    ("Discord", "discord", lambda c: c.gateway_url),
+    ("Feishu", "feishu", lambda c: f"app_id: {c.app_id[:10]}..." if c.app_id else _NOT_CONFIGURED),
+    ("Mochat", "mochat", lambda c: c.base_url or _NOT_CONFIGURED),
+    ("Telegram", "telegram", lambda c: f"token: {c.token[:10]}..." if c.token else _NOT_CONFIGURED),
+    ("Slack", "slack", lambda c: "socket" if c.app_token and c.bot_token else _NOT_CONFIGURED),
+)
+
 
 @channels_app.command("status")
 def channels_status():
     """Show channel status."""
-    from nanobot.config.loader import load_config
+    from rich.table import Table
 
-    config = load_config()
+    config = _config_cached()
 
     table = Table(title="Channel Status")
     table.add_column("Channel", style="cyan")
     table.add_column("Enabled", style="green")
     table.add_column("Configuration", style="yellow")
 
-    # WhatsApp
-    wa = config.channels.whatsapp
-    table.add_row("WhatsApp", "✓" if wa.enabled else "✗", wa.bridge_url)
+    for label, attr, describe in _CHANNEL_SPECS:
+        cfg = getattr(config.channels, attr)
+        table.add_row(label, "✓" if cfg.enabled else "✗", describe(cfg))
 
-    dc = config.channels.discord
-    table.add_row("Discord", "✓" if dc.enabled else "✗", dc.gateway_url)
+    console.print(table)
 
-    # Feishu
-    fs = config.channels.feishu
-    fs_config = f"app_id: {fs.app_id[:10]}..." if fs.app_id else "[dim]not configured[/dim]"
-    table.add_row("Feishu", "✓" if fs.enabled else "✗", fs_config)
 
-    # Mochat
-    mc = config.channels.mochat
-    mc_base = mc.base_url or "[dim]not configured[/dim]"
-    table.add_row("Mochat", "✓" if mc.enabled else "✗", mc_base)
+BRIDGE_STAMP_FILE = ".build-stamp"
 
-    # Telegram
-    tg = config.channels.telegram
-    tg_config = f"token: {tg.token[:10]}..." if tg.token else "[dim]not configured[/dim]"
-    table.add_row("Telegram", "✓" if tg.enabled else "✗", tg_config)
 
-    # Slack
-    slack = config.channels.slack
-    slack_config = "socket" if slack.app_token and slack.bot_token else "[dim]not configured[/dim]"
-    table.add_row("Slack", "✓" if slack.enabled else "✗", slack_config)
+def _bridge_source_files(source: Path) -> list[Path]:
+    """Return the bridge sources that determine the built output."""
+    files = [source / name for name in ("package.json", "package-lock.json", "tsconfig.json")]
+    files += sorted((source / "src").rglob("*"))
+    return [f for f in files if f.is_file()]
 
-    console.print(table)
+
+def _bridge_source_fingerprint(source: Path, files: list[Path]) -> str:
+    """Cheap (path, size, mtime_ns) summary of ``files``, checked before hashing."""
+    parts = []
+    for f in files:
+        st = f.stat()
+        parts.append(f"{f.relative_to(source)}:{st.st_size}:{st.st_mtime_ns}")
+    return "|".join(parts)
+
+
+def _bridge_source_digest(source: Path, files: list[Path]) -> str:
+    """Hash the contents of the bridge sources."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    for f in files:
+        digest.update(str(f.relative_to(source)).encode())
+        digest.update(f.read_bytes())
+    return digest.hexdigest()
+
+
+def _read_bridge_stamp(stamp_file: Path) -> dict[str, str]:
+    """Read the ``{"fingerprint", "digest"}`` stamp; unreadable stamps are empty."""
+    from nanobot.utils import fastjson
+
+    try:
+        stamp = fastjson.loads(stamp_file.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return stamp if isinstance(stamp, dict) else {}
+
+
+def _write_bridge_stamp(stamp_file: Path, fingerprint: str, digest: str) -> None:
+    """Record the sources the bridge in ``stamp_file``'s directory was built from."""
+    from nanobot.utils import fastjson
+
+    stamp_file.write_bytes(fastjson.dumps({"fingerprint": fingerprint, "digest": digest}))
+
+
+def _bridge_is_current(source: Path, stamp_file: Path) -> tuple[bool, str, str | None]:
+    """Compare the sources with the stamp of the last build.
+
+    Returns ``(current, fingerprint, digest)``.  The sources are only hashed
+    when their sizes or mtimes differ from the stamp (``digest`` is None
+    otherwise); a matching hash refreshes the stamp's fingerprint.
+    """
+    files = _bridge_source_files(source)
+    fingerprint = _bridge_source_fingerprint(source, files)
+    stamp = _read_bridge_stamp(stamp_file)
+    if stamp and stamp.get("fingerprint") == fingerprint:
+        return True, fingerprint, None
+    digest = _bridge_source_digest(source, files)
+    if stamp and stamp.get("digest") == digest:
+        _write_bridge_stamp(stamp_file, fingerprint, digest)
+        return True, fingerprint, digest
+    return False, fingerprint, digest
+
+
+def _sync_tree(src: Path, dst: Path, ignore: frozenset[str] = frozenset()) -> None:
+    """Mirror ``src`` into ``dst``, copying only files whose size or mtime differ."""
+    import shutil
+
+    dst.mkdir(parents=True, exist_ok=True)
+    with os.scandir(dst) as it:
+        existing = {entry.name: entry for entry in it}
+
+    with os.scandir(src) as it:
+        for entry in it:
+            if entry.name in ignore:
+                continue
+            target = existing.pop(entry.name, None)
+            is_dir = entry.is_dir(follow_symlinks=False)
+            if target is not None and target.is_dir(follow_symlinks=False) != is_dir:
+                # Changed between file and directory: drop the stale one first
+                _remove_entry(target)
+                target = None
+            if is_dir:
+                _sync_tree(Path(entry.path), dst / entry.name, ignore)
+                continue
+            st = entry.stat()
+            if target is not None and target.is_file(follow_symlinks=False):
+                tst = target.stat()
+                if tst.st_size == st.st_size and tst.st_mtime_ns == st.st_mtime_ns:
+                    continue
+            shutil.copy2(entry.path, dst / entry.name)
+
+    # Drop files that no longer exist upstream (ignored names are left alone)
+    for name, entry in existing.items():
+        if name not in ignore:
+            _remove_entry(entry)
+
+
+def _remove_entry(entry: os.DirEntry) -> None:
+    """Delete a file, symlink or directory tree found by ``os.scandir``."""
+    import shutil
+
+    if entry.is_dir(follow_symlinks=False):
+        shutil.rmtree(entry.path)
+    else:
+        os.unlink(entry.path)
 
 
 def _get_bridge_dir() -> Path:
-    """Get the bridge directory, setting it up if needed."""
+    """Get the bridge directory, setting it up if needed.
+
+    A digest of the bridge sources is stored in ``.build-stamp`` after each
+    successful build, so the copy + ``npm install`` + build steps only rerun
+    when the shipped bridge actually changes.  The stamp also records the
+    sources' sizes and mtimes, so unchanged sources are not re-hashed.
+    """
     import shutil
-    import subprocess
 
     # User's bridge location
     user_bridge = Path.home() / ".nanobot" / "bridge"
-
-    # Check if already built
-    if (user_bridge / "dist" / "index.js").exists():
-        return user_bridge
-
-    # Check for npm
-    if not shutil.which("npm"):
-        console.print("[red]npm not found. Please install Node.js >= 18.[/red]")
-        raise typer.Exit(1)
+    stamp_file = user_bridge / BRIDGE_STAMP_FILE
 
     # Find source bridge: first check package data, then source dir
     pkg_bridge = Path(__file__).parent.parent / "bridge"  # nanobot/bridge (installed)
@@ -611,6 +815,20 @@ def _get_bridge_dir() -> Path:
     elif (src_bridge / "package.json").exists():
         source = src_bridge
 
+    # Check if already built from the current sources
+    built = (user_bridge / "dist" / "index.js").exists()
+    if built and source is None:
+        return user_bridge
+    if source is not None:
+        current, fingerprint, digest = _bridge_is_current(source, stamp_file)
+        if built and current:
+            return user_bridge
+
+    # Check for npm
+    if not shutil.which("npm"):
+        console.print("[red]npm not found. Please install Node.js >= 18.[/red]")
+        raise typer.Exit(1)
+
     if not source:
         console.print("[red]Bridge source not found.[/red]")
         console.print("Try reinstalling: pip install --force-reinstall nanobot")
@@ -618,30 +836,89 @@ def _get_bridge_dir() -> Path:
 
     console.print(f"{__logo__} Setting up bridge...")
 
-    # Copy to user directory
-    user_bridge.parent.mkdir(parents=True, exist_ok=True)
-    if user_bridge.exists():
-        shutil.rmtree(user_bridge)
-    shutil.copytree(source, user_bridge, ignore=shutil.ignore_patterns("node_modules", "dist"))
+    # Sync into the user directory; node_modules stays in place for npm to reuse
+    _sync_tree(source, user_bridge, ignore=frozenset({"node_modules", "dist", BRIDGE_STAMP_FILE}))
 
     # Install and build
-    try:
-        console.print("  Installing dependencies...")
-        subprocess.run(["npm", "install"], cwd=user_bridge, check=True, capture_output=True)
+    console.print("  Installing dependencies...")
+    _run_npm(["install"], user_bridge)
 
-        console.print("  Building...")
-        subprocess.run(["npm", "run", "build"], cwd=user_bridge, check=True, capture_output=True)
+    console.print("  Building...")
+    _run_npm(["run", "build"], user_bridge)
 
-        console.print("[green]✓[/green] Bridge ready\n")
-    except subprocess.CalledProcessError as e:
-        console.print(f"[red]Build failed: {e}[/red]")
-        if e.stderr:
-            console.print(f"[dim]{e.stderr.decode()[:500]}[/dim]")
-        raise typer.Exit(1)
+    if digest is None:
+        digest = _bridge_source_digest(source, _bridge_source_files(source))
+    _write_bridge_stamp(stamp_file, fingerprint, digest)
+    console.print("[green]✓[/green] Bridge ready\n")
 
     return user_bridge
 
 
+def _run_npm(args: list[str], cwd: Path) -> None:
+    """Run an npm command; stdout is discarded, stderr is kept for the error report."""
+    import subprocess
+
+    proc = subprocess.run(
+        ["npm", *args], cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+    )
+    if proc.returncode != 0:
+        console.print(f"[red]Build failed: npm {' '.join(args)} exited with {proc.returncode}[/red]")
+        if proc.stderr:
+            console.print(f"[dim]{proc.stderr[:500].decode(errors='replace')}[/dim]")
+        raise typer.Exit(1)
+
+
+def _bridge_is_running(bridge_url: str) -> bool:
+    """Return True if a WebSocket server already answers on the bridge address.
+
+    A bare TCP connect would accept any listener on that port, so the
+    WebSocket upgrade is performed and its ``Sec-WebSocket-Accept`` checked;
+    anything else falls through to a normal bridge start.
+    """
+    import base64
+    import hashlib
+    import socket
+    from urllib.parse import urlparse
+
+    parsed = urlparse(bridge_url)
+    if not parsed.hostname or parsed.scheme not in ("ws", "http"):
+        return False
+    key = base64.b64encode(os.urandom(16)).decode()
+    expected = base64.b64encode(
+        hashlib.sha1((key + "258EAFA5-E914-47DA-95CA-C5AB0DC85B11").encode()).digest()
+    ).decode()
+    host = parsed.hostname if ":" not in parsed.hostname else f"[{parsed.hostname}]"
+    port = parsed.port or 80
+    request = (
+        f"GET {parsed.path or '/'} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Upgrade: websocket\r\n"
+        "Connection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\n"
+        "Sec-WebSocket-Version: 13\r\n\r\n"
+    )
+    try:
+        with socket.create_connection((parsed.hostname, port), timeout=0.5) as sock:
+            sock.sendall(request.encode())
+            response = b""
+            while b"\r\n\r\n" not in response and len(response) < 8192:
+                chunk = sock.recv(1024)
+                if not chunk:
+                    break
+                response += chunk
+    except OSError:
+        return False
+
+    status, _, headers = response.partition(b"\r\n")
+    if status.split(b" ", 2)[1:2] != [b"101"]:
+        return False
+    for line in headers.split(b"\r\n"):
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"sec-websocket-accept":
+            return value.strip().decode(errors="replace") == expected
+    return False
+
+
 @channels_app.command("login")
 def channels_login():
     """Link device via QR code."""
@@ -649,6 +926,15 @@ def channels_login():
     from nanobot.config.loader import load_config
 
     config = load_config()
+    bridge_url = config.channels.whatsapp.bridge_url
+
+    # A bridge that is already running keeps its WhatsApp session; reuse it
+    # instead of spawning a second Node process that would fail to bind.
+    if _bridge_is_running(bridge_url):
+        console.print(f"[green]✓[/green] Bridge already running at {bridge_url}")
+        console.print("Check the terminal running the bridge for the QR code.")
+        return
+
     bridge_dir = _get_bridge_dir()
 
     console.print(f"{__logo__} Starting bridge...")
@@ -679,11 +965,9 @@ def cron_list(
     all: bool = typer.Option(False, "--all", "-a", help="Include disabled jobs"),
 ):
     """List scheduled jobs."""
-    from nanobot.config.loader import get_data_dir
-    from nanobot.cron.service import CronService
+    from rich.table import Table
 
-    store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = _cron_service()
 
     jobs = service.list_jobs(include_disabled=all)
 
@@ -700,26 +984,29 @@ def cron_list(
 
     import time
 
-    for job in jobs:
-        # Format schedule
-        if job.schedule.kind == "every":
-            sched = f"every {(job.schedule.every_ms or 0) // 1000}s"
-        elif job.schedule.kind == "cron":
-            sched = job.schedule.expr or ""
-        else:
-            sched = "one-time"
-
-        # Format next run
-        next_run = ""
-        if job.state.next_run_at_ms:
-            next_time = time.strftime(
-                "%Y-%m-%d %H:%M", time.localtime(job.state.next_run_at_ms / 1000)
-            )
-            next_run = next_time
-
-        status = "[green]enabled[/green]" if job.enabled else "[dim]disabled[/dim]"
+    localtime, strftime = time.localtime, time.strftime
 
-        table.add_row(job.id, job.name, sched, status, next_run)
+    def _schedule(job) -> str:
+        if job.schedule.kind == "every":
+            return f"every {(job.schedule.every_ms or 0) // 1000}s"
+        if job.schedule.kind == "cron":
+            return job.schedule.expr or ""
+        return "one-time"
+
+    rows = [
+        (
+            job.id,
+            job.name,
+            _schedule(job),
+            "[green]enabled[/green]" if job.enabled else "[dim]disabled[/dim]",
+            strftime("%Y-%m-%d %H:%M", localtime(ms * 1e-3))
+            if (ms := job.state.next_run_at_ms)
+            else "",
+        )
+        for job in jobs
+    ]
+    for row in rows:
+        table.add_row(*row)
 
     console.print(table)
 
@@ -738,8 +1025,6 @@ def cron_add(
     ),
 ):
     """Add a scheduled job."""
-    from nanobot.config.loader import get_data_dir
-    from nanobot.cron.service import CronService
     from nanobot.cron.types import CronSchedule
 
     # Determine schedule type
@@ -756,8 +1041,7 @@ def cron_add(
         console.print("[red]Error: Must specify --every, --cron, or --at[/red]")
         raise typer.Exit(1)
 
-    store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = _cron_service()
 
     job = service.add_job(
         name=name,
@@ -776,11 +1060,7 @@ def cron_remove(
     job_id: str = typer.Argument(..., help="Job ID to remove"),
 ):
     """Remove a scheduled job."""
-    from nanobot.config.loader import get_data_dir
-    from nanobot.cron.service import CronService
-
-    store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = _cron_service()
 
     if service.remove_job(job_id):
         console.print(f"[green]✓[/green] Removed job {job_id}")
@@ -794,11 +1074,7 @@ def cron_enable(
     disable: bool = typer.Option(False, "--disable", help="Disable instead of enable"),
 ):
     """Enable or disable a job."""
-    from nanobot.config.loader import get_data_dir
-    from nanobot.cron.service import CronService
-
-    store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = _cron_service()
 
     job = service.enable_job(job_id, enabled=not disable)
     if job:
@@ -814,11 +1090,7 @@ def cron_run(
     force: bool = typer.Option(False, "--force", "-f", help="Run even if disabled"),
 ):
     """Manually run a job."""
-    from nanobot.config.loader import get_data_dir
-    from nanobot.cron.service import CronService
-
-    store_path = get_data_dir() / "cron" / "jobs.json"
-    service = CronService(store_path)
+    service = _cron_service()
 
     async def run():
         return await service.run_job(job_id, force=force)
@@ -837,10 +1109,10 @@ def cron_run(
 @app.command()
 def status():
     """Show nanobot status."""
-    from nanobot.config.loader import load_config, get_config_path
+    from nanobot.config.loader import get_config_path
 
     config_path = get_config_path()
-    config = load_config()
+    config = _config_cached()
     workspace = config.workspace_path
 
     console.print(f"{__logo__} nanobot Status\n")
@@ -862,9 +1134,7 @@ def status():
         # Antigravity status
         ag = config.providers.antigravity
         if ag.enabled:
-            from nanobot.providers.antigravity.auth import AntigravityAuthManager
-
-            auth = AntigravityAuthManager()
+            auth = _auth_manager()
             if auth.is_authenticated:
                 console.print(f"Antigravity: [green]✓ {auth.email}[/green]")
             else:
@@ -959,6 +1229,7 @@ def auth_status():
 @auth_app.command("list")
 def auth_list():
     """List all stored Antigravity accounts."""
+    from rich.table import Table
     from nanobot.providers.antigravity.auth import AntigravityAuthManager
 
     auth = AntigravityAuthManager()
@@ -1000,7 +1271,9 @@ def auth_switch(
 
 @auth_app.command("logout")
 def auth_logout(
-    email: str = typer.Option(None, "--email", "-e", help="Specific account to remove"),
+    emails: list[str] = typer.Option(
+        None, "--email", "-e", help="Account to remove (repeat to remove several)"
+    ),
     all_accounts: bool = typer.Option(False, "--all", "-a", help="Remove all accounts"),
 ):
     """Remove stored Antigravity credentials."""
@@ -1011,9 +1284,10 @@ def auth_logout(
     if all_accounts:
         auth.logout("*")
         console.print("[green]✓[/green] All credentials removed")
-    elif email:
-        auth.logout(email)
-        console.print(f"[green]✓[/green] Credentials for {email} removed")
+    elif emails:
+        # One credentials write for however many accounts are named
+        auth.logout_many(emails)
+        console.print(f"[green]✓[/green] Credentials for {', '.join(emails)} removed")
         if auth.is_authenticated:
             console.print(f"[dim]  Active account: {auth.email}[/dim]")
     else:
@@ -1034,208 +1308,12 @@ def hello(name: str = typer.Option(..., help="Name to greet")):
 # Metrics Commands
 # ============================================================================
 
+# The metrics group lives in nanobot.cli.metrics; its commands import the
+# metrics/report machinery only when they run.
+from nanobot.cli.metrics import metrics_app  # noqa: E402
 
-metrics_app = typer.Typer(help="View agent metrics and observability data")
 app.add_typer(metrics_app, name="metrics")
 
 
-@metrics_app.command("summary")
-def metrics_summary(
-    hours: float = typer.Option(24, "--hours", "-h", help="Look-back window in hours"),
-):
-    """Show high-level metrics summary."""
-    from nanobot.metrics.collector import MetricsCollector
-    from nanobot.metrics.report import summary_report
-
-    collector = MetricsCollector()
-    report = summary_report(collector, hours=hours)
-
-    console.print(f"\n{__logo__} Metrics Summary (last {report['period_hours']}h)\n")
-
-    ov = report["overview"]
-    table = Table(title="Overview")
-    table.add_column("Metric", style="cyan")
-    table.add_column("Value", justify="right")
-    table.add_row("Sessions", str(ov["total_sessions"]))
-    table.add_row("Success rate", f"{ov['success_rate']}%")
-    table.add_row("Avg iterations/session", str(ov["avg_iterations_per_session"]))
-    table.add_row("LLM calls", str(report["llm_calls"]))
-    console.print(table)
-
-    tok = report["tokens"]
-    table2 = Table(title="Tokens")
-    table2.add_column("Metric", style="cyan")
-    table2.add_column("Value", justify="right")
-    table2.add_row("Total prompt", f"{tok['total_prompt']:,}")
-    table2.add_row("Total completion", f"{tok['total_completion']:,}")
-    table2.add_row("Total", f"{tok['total']:,}")
-    table2.add_row("Avg per session", f"{tok['avg_per_session']:,}")
-    table2.add_row("Per success", f"{tok['per_success']:,}")
-    console.print(table2)
-
-    tl = report["tools"]
-    table3 = Table(title="Tools")
-    table3.add_column("Metric", style="cyan")
-    table3.add_column("Value", justify="right")
-    table3.add_row("Total calls", str(tl["total_calls"]))
-    table3.add_row("Success rate", f"{tl['success_rate']}%")
-    console.print(table3)
-    console.print()
-
-
-@metrics_app.command("tools")
-def metrics_tools(
-    hours: float = typer.Option(24, "--hours", "-h", help="Look-back window in hours"),
-):
-    """Show per-tool metrics breakdown."""
-    from nanobot.metrics.collector import MetricsCollector
-    from nanobot.metrics.report import tool_report
-
-    collector = MetricsCollector()
-    rows = tool_report(collector, hours=hours)
-
-    if not rows:
-        console.print("[yellow]No tool events recorded yet.[/yellow]")
-        return
-
-    console.print(f"\n{__logo__} Tool Metrics (last {hours}h)\n")
-
-    table = Table()
-    table.add_column("Tool", style="cyan")
-    table.add_column("Calls", justify="right")
-    table.add_column("Success %", justify="right")
-    table.add_column("Avg Latency", justify="right")
-    table.add_column("Avg In", justify="right")
-    table.add_column("Avg Out", justify="right")
-    table.add_column("Top Errors", style="red")
-
-    for r in rows:
-        errors = (
-            ", ".join(f"{k}({v})" for k, v in r["top_errors"].items()) if r["top_errors"] else ""
-        )
-        table.add_row(
-            r["tool"],
-            str(r["calls"]),
-            f"{r['success_rate']}%",
-            f"{r['avg_latency_ms']}ms",
-            str(r["avg_input_size"]),
-            str(r["avg_output_size"]),
-            errors[:60] if errors else "[dim]-[/dim]",
-        )
-
-    console.print(table)
-    console.print()
-
-
-@metrics_app.command("sessions")
-def metrics_sessions(
-    last: int = typer.Option(20, "--last", "-n", help="Number of recent sessions"),
-):
-    """Show recent session summaries."""
-    from nanobot.metrics.collector import MetricsCollector
-    from nanobot.metrics.report import session_report
-
-    collector = MetricsCollector()
-    rows = session_report(collector, last_n=last)
-
-    if not rows:
-        console.print("[yellow]No sessions recorded yet.[/yellow]")
-        return
-
-    console.print(f"\n{__logo__} Recent Sessions (last {last})\n")
-
-    table = Table()
-    table.add_column("Session", style="cyan", max_width=30)
-    table.add_column("Time", max_width=16)
-    table.add_column("OK", justify="center")
-    table.add_column("Iter", justify="right")
-    table.add_column("Tools", justify="right")
-    table.add_column("Tokens", justify="right")
-    table.add_column("Duration", justify="right")
-    table.add_column("Model", style="dim", max_width=20)
-
-    for r in rows:
-        started = r["started_at"][:16] if r["started_at"] != "?" else "?"
-        ok = "[green]✓[/green]" if r["success"] else "[red]✗[/red]"
-        dur = f"{r['duration_ms']}ms" if r["duration_ms"] else "?"
-        table.add_row(
-            r["session_id"],
-            started,
-            ok,
-            str(r["iterations"]),
-            str(r["tool_calls"]),
-            f"{r['total_tokens']:,}",
-            dur,
-            r["model"],
-        )
-
-    console.print(table)
-    console.print()
-
-
-@metrics_app.command("models")
-def metrics_models(
-    hours: float = typer.Option(
-        168, "--hours", "-h", help="Look-back window in hours (default: 7 days)"
-    ),
-):
-    """Compare model efficiency and success rates."""
-    from nanobot.metrics.collector import MetricsCollector
-    from nanobot.metrics.report import model_report
-
-    collector = MetricsCollector()
-    rows = model_report(collector, hours=hours)
-
-    if not rows:
-        console.print("[yellow]No session data recorded yet.[/yellow]")
-        return
-
-    console.print(f"\n{__logo__} Model Comparison (last {hours}h)\n")
-
-    table = Table()
-    table.add_column("Model", style="cyan")
-    table.add_column("Sessions", justify="right")
-    table.add_column("Success %", justify="right")
-    table.add_column("Total Tokens", justify="right")
-    table.add_column("Tokens/Session", justify="right")
-    table.add_column("Tokens/Success", justify="right")
-
-    for r in rows:
-        table.add_row(
-            r["model"],
-            str(r["sessions"]),
-            f"{r['success_rate']}%",
-            f"{r['total_tokens']:,}",
-            f"{r['tokens_per_session']:,}",
-            f"{r['tokens_per_success']:,}",
-        )
-
-    console.print(table)
-    console.print()
-
-
-@metrics_app.command("reset")
-def metrics_reset(
-    confirm: bool = typer.Option(False, "--yes", "-y", help="Skip confirmation"),
-):
-    """Clear all collected metrics data."""
-    from nanobot.metrics.collector import MetricsCollector
-
-    collector = MetricsCollector()
-    metrics_dir = collector.metrics_dir
-
-    if not confirm:
-        if not typer.confirm(f"Delete all metrics in {metrics_dir}?"):
-            raise typer.Exit()
-
-    import shutil
-
-    if metrics_dir.exists():
-        shutil.rmtree(metrics_dir)
-        console.print("[green]✓[/green] Metrics data cleared")
-    else:
-        console.print("[dim]No metrics data found[/dim]")
-
-
 if __name__ == "__main__":
     app()
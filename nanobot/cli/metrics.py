@@ -0,0 +1,222 @@
+"""`nanobot metrics` commands, registered by nanobot.cli.commands."""
+
+import typer
+from rich.text import Text
+
+from nanobot import __logo__
+
+# Shared, pre-styled cells so rows don't re-parse the same markup per cell.
+_OK_MARK = Text("✓", style="green")
+_FAIL_MARK = Text("✗", style="red")
+_DIM_DASH = Text("-", style="dim")
+
+metrics_app = typer.Typer(help="View agent metrics and observability data")
+
+
+@metrics_app.command("summary")
+def metrics_summary(
+    hours: float = typer.Option(24, "--hours", "-h", help="Look-back window in hours"),
+):
+    """Show high-level metrics summary."""
+    from rich.table import Table
+
+    from nanobot.cli.commands import console
+    from nanobot.metrics.collector import MetricsCollector
+    from nanobot.metrics.report import summary_report
+
+    collector = MetricsCollector()
+    report = summary_report(collector, hours=hours)
+
+    console.print(f"\n{__logo__} Metrics Summary (last {report['period_hours']}h)\n")
+
+    ov = report["overview"]
+    table = Table(title="Overview")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right")
+    table.add_row("Sessions", str(ov["total_sessions"]))
+    table.add_row("Success rate", f"{ov['success_rate']}%")
+    table.add_row("Avg iterations/session", str(ov["avg_iterations_per_session"]))
+    table.add_row("LLM calls", str(report["llm_calls"]))
+    console.print(table)
+
+    tok = report["tokens"]
+    table2 = Table(title="Tokens")
+    table2.add_column("Metric", style="cyan")
+    table2.add_column("Value", justify="right")
+    table2.add_row("Total prompt", f"{tok['total_prompt']:,}")
+    table2.add_row("Total completion", f"{tok['total_completion']:,}")
+    table2.add_row("Total", f"{tok['total']:,}")
+    table2.add_row("Avg per session", f"{tok['avg_per_session']:,}")
+    table2.add_row("Per success", f"{tok['per_success']:,}")
+    console.print(table2)
+
+    tl = report["tools"]
+    table3 = Table(title="Tools")
+    table3.add_column("Metric", style="cyan")
+    table3.add_column("Value", justify="right")
+    table3.add_row("Total calls", str(tl["total_calls"]))
+    table3.add_row("Success rate", f"{tl['success_rate']}%")
+    console.print(table3)
+    console.print()
+
+
+@metrics_app.command("tools")
+def metrics_tools(
+    hours: float = typer.Option(24, "--hours", "-h", help="Look-back window in hours"),
+):
+    """Show per-tool metrics breakdown."""
+    from rich.console import Group
+    from rich.table import Table
+
+    from nanobot.cli.commands import console
+    from nanobot.metrics.collector import MetricsCollector
+    from nanobot.metrics.report import tool_report
+
+    collector = MetricsCollector()
+    rows = tool_report(collector, hours=hours)
+
+    if not rows:
+        console.print("[yellow]No tool events recorded yet.[/yellow]")
+        return
+
+    table = Table()
+    table.add_column("Tool", style="cyan")
+    table.add_column("Calls", justify="right")
+    table.add_column("Success %", justify="right")
+    table.add_column("Avg Latency", justify="right")
+    table.add_column("Avg In", justify="right")
+    table.add_column("Avg Out", justify="right")
+    table.add_column("Top Errors", style="red")
+
+    cells = [
+        (
+            r["tool"],
+            str(r["calls"]),
+            f"{r['success_rate']}%",
+            f"{r['avg_latency_ms']}ms",
+            str(r["avg_input_size"]),
+            str(r["avg_output_size"]),
+            ", ".join(f"{k}({v})" for k, v in r["top_errors"].items())[:60] or _DIM_DASH,
+        )
+        for r in rows
+    ]
+    for row in cells:
+        table.add_row(*row)
+
+    console.print(Group(Text(f"\n{__logo__} Tool Metrics (last {hours}h)\n"), table, Text("")))
+
+
+@metrics_app.command("sessions")
+def metrics_sessions(
+    last: int = typer.Option(20, "--last", "-n", help="Number of recent sessions"),
+):
+    """Show recent session summaries."""
+    from rich.console import Group
+    from rich.table import Table
+
+    from nanobot.cli.commands import console
+    from nanobot.metrics.collector import MetricsCollector
+    from nanobot.metrics.report import session_report
+
+    collector = MetricsCollector()
+    rows = session_report(collector, last_n=last)
+
+    if not rows:
+        console.print("[yellow]No sessions recorded yet.[/yellow]")
+        return
+
+    table = Table()
+    table.add_column("Session", style="cyan", max_width=30)
+    table.add_column("Time", max_width=16)
+    table.add_column("OK", justify="center")
+    table.add_column("Iter", justify="right")
+    table.add_column("Tools", justify="right")
+    table.add_column("Tokens", justify="right")
+    table.add_column("Duration", justify="right")
+    table.add_column("Model", style="dim", max_width=20)
+
+    cells = [
+        (
+            r["session_id"],
+            r["started_at"][:16],
+            _OK_MARK if r["success"] else _FAIL_MARK,
+            str(r["iterations"]),
+            str(r["tool_calls"]),
+            f"{r['total_tokens']:,}",
+            f"{r['duration_ms']}ms" if r["duration_ms"] else "?",
+            r["model"],
+        )
+        for r in rows
+    ]
+    for row in cells:
+        table.add_row(*row)
+
+    console.print(Group(Text(f"\n{__logo__} Recent Sessions (last {last})\n"), table, Text("")))
+
+
+@metrics_app.command("models")
+def metrics_models(
+    hours: float = typer.Option(
+        168, "--hours", "-h", help="Look-back window in hours (default: 7 days)"
+    ),
+):
+    """Compare model efficiency and success rates."""
+    from rich.table import Table
+
+    from nanobot.cli.commands import console
+    from nanobot.metrics.collector import MetricsCollector
+    from nanobot.metrics.report import model_report
+
+    collector = MetricsCollector()
+    rows = model_report(collector, hours=hours)
+
+    if not rows:
+        console.print("[yellow]No session data recorded yet.[/yellow]")
+        return
+
+    console.print(f"\n{__logo__} Model Comparison (last {hours}h)\n")
+
+    table = Table()
+    table.add_column("Model", style="cyan")
+    table.add_column("Sessions", justify="right")
+    table.add_column("Success %", justify="right")
+    table.add_column("Total Tokens", justify="right")
+    table.add_column("Tokens/Session", justify="right")
+    table.add_column("Tokens/Success", justify="right")
+
+    for r in rows:
+        table.add_row(
+            r["model"],
+            str(r["sessions"]),
+            f"{r['success_rate']}%",
+            f"{r['total_tokens']:,}",
+            f"{r['tokens_per_session']:,}",
+            f"{r['tokens_per_success']:,}",
+        )
+
+    console.print(table)
+    console.print()
+
+
+@metrics_app.command("reset")
+def metrics_reset(
+    confirm: bool = typer.Option(False, "--yes", "-y", help="Skip confirmation"),
+):
+    """Clear all collected metrics data."""
+    from nanobot.cli.commands import console
+    from nanobot.metrics.collector import MetricsCollector
+
+    collector = MetricsCollector()
+    metrics_dir = collector.metrics_dir
+
+    if not confirm:
+        if not typer.confirm(f"Delete all metrics in {metrics_dir}?"):
+            raise typer.Exit()
+
+    import shutil
+
+    if metrics_dir.exists():
+        shutil.rmtree(metrics_dir)
+        console.print("[green]✓[/green] Metrics data cleared")
+    else:
+        console.print("[dim]No metrics data found[/dim]")
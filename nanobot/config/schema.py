@@ -1,7 +1,7 @@
 """Configuration schema using Pydantic."""
 
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -195,6 +195,15 @@ class AgentDefaults(BaseModel):
     workspace: str = "~/.nanobot/workspace"
     max_tool_iterations: int = 20
     memory_window: int = 50
+    metrics_sampling: str = "full"  # "full", "aggregate" or "reservoir[:N]" for tool events
+
+    @field_validator("metrics_sampling")
+    @classmethod
+    def _check_metrics_sampling(cls, v: str) -> str:
+        from nanobot.metrics.collector import parse_sampling
+
+        parse_sampling(v)
+        return v
 
 
 class AgentsConfig(BaseModel):
@@ -216,6 +225,7 @@ class AntigravityConfig(BaseModel):
 
     enabled: bool = False
     endpoint: str = ""  # Custom API endpoint (default: daily sandbox)
+    prewarm_fallbacks: bool = False  # Open the fallback endpoint's connection during retry backoff
 
 
 class ProvidersConfig(BaseModel):
@@ -1,7 +1,6 @@
 """Cron service for scheduling agent tasks."""
 
 import asyncio
-import json
 import time
 import uuid
 from pathlib import Path
@@ -10,6 +9,7 @@ from typing import Any, Callable, Coroutine
 from loguru import logger
 
 from nanobot.cron.types import CronJob, CronJobState, CronPayload, CronSchedule, CronStore
+from nanobot.utils import fastjson
 
 
 def _now_ms() -> int:
@@ -50,17 +50,27 @@ class CronService:
         self.store_path = store_path
         self.on_job = on_job  # Callback to execute job, returns response text
         self._store: CronStore | None = None
+        self._store_mtime_ns: int | None = None  # jobs.json mtime the store reflects
         self._timer_task: asyncio.Task | None = None
         self._running = False
     
+    def _file_mtime_ns(self) -> int | None:
+        """Return the store file's mtime in ns, or None if it does not exist."""
+        try:
+            return self.store_path.stat().st_mtime_ns
+        except OSError:
+            return None
+
     def _load_store(self) -> CronStore:
-        """Load jobs from disk."""
-        if self._store:
+        """Load jobs from disk, re-parsing only when jobs.json changed."""
+        mtime_ns = self._file_mtime_ns()
+        if self._store and mtime_ns == self._store_mtime_ns:
             return self._store
         
-        if self.store_path.exists():
+        self._store_mtime_ns = mtime_ns
+        if mtime_ns is not None:
             try:
-                data = json.loads(self.store_path.read_text())
+                data = fastjson.loads(self.store_path.read_bytes())
                 jobs = []
                 for j in data.get("jobs", []):
                     jobs.append(CronJob(
@@ -142,7 +152,8 @@ class CronService:
             ]
         }
         
-        self.store_path.write_text(json.dumps(data, indent=2))
+        self.store_path.write_bytes(fastjson.dumps(data, indent=True))
+        self._store_mtime_ns = self._file_mtime_ns()
     
     async def start(self) -> None:
         """Start the cron service."""
@@ -203,7 +214,7 @@ class CronService:
         
         now = _now_ms()
         due_jobs = [
-            j for j in self._store.jobs
+            j for j in self._load_store().jobs
             if j.enabled and j.state.next_run_at_ms and now >= j.state.next_run_at_ms
         ]
         
@@ -222,23 +233,28 @@ class CronService:
             response = None
             if self.on_job:
                 response = await self.on_job(job)
-            
-            job.state.last_status = "ok"
-            job.state.last_error = None
-            logger.info(f"Cron: job '{job.name}' completed")
-            
         except Exception as e:
-            job.state.last_status = "error"
-            job.state.last_error = str(e)
+            status, error = "error", str(e)
             logger.error(f"Cron: job '{job.name}' failed: {e}")
+        else:
+            status, error = "ok", None
+            logger.info(f"Cron: job '{job.name}' completed")
         
+        # jobs.json may have been reloaded while the job ran (it can edit jobs
+        # itself); write the outcome to the job object the store holds now.
+        store = self._load_store()
+        job = next((j for j in store.jobs if j.id == job.id), None)
+        if job is None:
+            return  # removed while running
+        job.state.last_status = status
+        job.state.last_error = error
         job.state.last_run_at_ms = start_ms
         job.updated_at_ms = _now_ms()
         
         # Handle one-shot jobs
         if job.schedule.kind == "at":
             if job.delete_after_run:
-                self._store.jobs = [j for j in self._store.jobs if j.id != job.id]
+                store.jobs = [j for j in store.jobs if j.id != job.id]
             else:
                 job.enabled = False
                 job.state.next_run_at_ms = None
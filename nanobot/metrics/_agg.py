@@ -0,0 +1,31 @@
+"""Compiled group-by reductions for large metrics histories.
+
+Only imported from the NumPy code paths in report.py.  When numba is not
+installed, ``group_sums`` is None and callers keep their NumPy fallback.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _group_sums(group_ids: np.ndarray, values: np.ndarray, n_groups: int):
+    """Row count and per-column sums of *values* for each group id."""
+    counts = np.zeros(n_groups, dtype=np.int64)
+    sums = np.zeros((n_groups, values.shape[1]), dtype=np.int64)
+    for i in range(group_ids.shape[0]):
+        g = group_ids[i]
+        counts[g] += 1
+        for j in range(values.shape[1]):
+            sums[g, j] += values[i, j]
+    return counts, sums
+
+
+# cache=True stores the compiled code next to this module, so the JIT cost
+# is paid once per install rather than once per process.
+group_sums = njit(cache=True, nogil=True)(_group_sums) if NUMBA_AVAILABLE else None
@@ -1,58 +1,258 @@
-"""JSONL-based metrics collector.
+"""msgpack-based metrics collector.
 
-Writes structured events to append-only JSONL files under ~/.nanobot/metrics/.
-Thread-safe for single-process async usage.  No external dependencies.
+Writes structured events to append-only msgpack logs under ~/.nanobot/metrics/,
+one file per log and day so bounded-window queries only open recent files.
+Each record is a little-endian uint32 length followed by one msgpack map.
+Writes are buffered in memory and flushed by a background thread, at the end of
+each session, and at interpreter exit.
+
+Tool events can instead be sampled (see ``MetricsCollector(sampling=...)``):
+"aggregate" keeps only per-tool running totals and "reservoir:N" keeps a uniform
+sample of N events per tool and day; both are snapshotted per day.  Snapshots
+merge each process's changes into the day file under a lock file, so several
+processes sampling into the same directory add up rather than overwrite.
 """
 
-import json
+import atexit
+import bisect
+import contextlib
+import functools
+import os
+import random
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from datetime import date, datetime
 from pathlib import Path
 
-from loguru import logger
+import msgpack
 
 from nanobot.metrics.models import ToolEvent, LLMEvent, SessionSummary
+from nanobot.utils import fastjson
 from nanobot.utils.helpers import ensure_dir
 
+_FRAME = struct.Struct("<I")
+
+# Flush once this many records are pending, or after FLUSH_INTERVAL seconds.
+BUFFER_LIMIT = 64
+FLUSH_INTERVAL = 0.5
+
+# How often the background thread snapshots sampled tool statistics.
+SNAPSHOT_INTERVAL = 60.0
+DEFAULT_RESERVOIR_SIZE = 1000
+
+
+def ts_epoch(ts: str) -> float:
+    """Epoch seconds for an ISO timestamp; 0.0 when missing or malformed."""
+    try:
+        return datetime.fromisoformat(ts).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def parse_sampling(sampling: str) -> tuple[str, int]:
+    """Split a ``"full"``, ``"aggregate"`` or ``"reservoir[:N]"`` mode into (mode, N)."""
+    mode, _, size = sampling.partition(":")
+    if mode not in ("full", "aggregate", "reservoir") or (size and mode != "reservoir"):
+        raise ValueError(f"Unknown metrics sampling mode: {sampling!r}")
+    try:
+        n = int(size) if size else DEFAULT_RESERVOIR_SIZE
+    except ValueError:
+        n = 0
+    if n <= 0:
+        raise ValueError(f"Reservoir size must be a positive integer: {sampling!r}")
+    return mode, n
+
+
+def merge_tool_stats(stats: dict[str, list], name: str, acc: list) -> None:
+    """Add one ``[calls, ok, latency, input, output, errors]`` row into *stats*."""
+    dst = stats.get(name)
+    if dst is None:
+        stats[name] = [*acc[:5], dict(acc[5])]
+        return
+    for i in range(5):
+        dst[i] += acc[i]
+    for key, count in acc[5].items():
+        dst[5][key] = dst[5].get(key, 0) + count
+
+
+def merge_reservoirs(dst: list, src: list, size: int) -> None:
+    """Merge reservoir ``[seen, sample]`` *src* into *dst*, keeping at most *size*.
+
+    Each kept slot is drawn from either side in proportion to the number of
+    events that side has seen, so the result stays a uniform sample.
+    """
+    a, b = dst[1], src[1]
+    if len(a) == dst[0] and len(b) == src[0] and len(a) + len(b) <= size:
+        dst[0], dst[1] = dst[0] + src[0], a + b
+        return
+    left, right = dst[0], src[0]
+    take_a = 0
+    for _ in range(min(size, left + right)):
+        if random.randrange(left + right) < left:
+            take_a += 1
+            left -= 1
+        else:
+            right -= 1
+    take_a = min(take_a, len(a))
+    take_b = min(size - take_a, len(b))
+    dst[0], dst[1] = dst[0] + src[0], random.sample(a, take_a) + random.sample(b, take_b)
+
+
+@contextlib.contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive lock on *path* (a no-op where fcntl is unavailable)."""
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@functools.cache
+def _logger():
+    """Import loguru only when there is something to report."""
+    from loguru import logger
+
+    return logger
+
 
 class MetricsCollector:
-    """Append-only JSONL metrics writer.
+    """Append-only msgpack metrics writer.
+
+    Layout (one ``YYYY-MM-DD.msgpack`` file per day, by the record's own timestamp):
+        tool_events/   — one record per tool invocation
+        llm_events/    — one record per LLM API call
+        sessions/      — one record per completed session
+
+    With ``sampling="aggregate"`` or ``"reservoir[:N]"``, tool events are not
+    logged individually; per-day snapshots go to ``tool_agg/`` or
+    ``tool_reservoir/`` instead and are read back with read_tool_stats().
 
-    Files:
-        tool_events.jsonl   — one line per tool invocation
-        llm_events.jsonl    — one line per LLM API call
-        sessions.jsonl      — one line per completed session
+    Single-file logs written by older versions (``*.jsonl`` / ``*.msgpack``)
+    are split into day files on first use.
     """
 
-    def __init__(self, metrics_dir: Path | None = None, *, enabled: bool = True):
+    def __init__(
+        self,
+        metrics_dir: Path | None = None,
+        *,
+        enabled: bool = True,
+        sampling: str = "full",
+    ):
+        mode, size = parse_sampling(sampling)
         self.enabled = enabled
+        self.sampling = mode
+        self._reservoir_size = size
+        # Changes since the last snapshot, merged into the day files on write:
+        # day -> tool -> running stats (aggregate) or [seen, sample] (reservoir)
+        self._tool_state: dict[str, dict[str, list]] = {}
+        self._state_dirty = False
+        self._last_snapshot = time.monotonic()
+        # path -> (st_mtime_ns, st_size, parsed records)
+        self._cache: dict[str, tuple[int, int, list[dict]]] = {}
+        self._pending: dict[str, list[bytes]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher: threading.Thread | None = None
         if not enabled:
             self._dir = Path("/dev/null")  # never used
             return
         self._dir = ensure_dir(metrics_dir or Path.home() / ".nanobot" / "metrics")
-        self._tool_path = self._dir / "tool_events.jsonl"
-        self._llm_path = self._dir / "llm_events.jsonl"
-        self._session_path = self._dir / "sessions.jsonl"
+        # Plain strings: paths are joined and opened on the hot path.
+        self._tool_dir = str(ensure_dir(self._dir / "tool_events"))
+        self._llm_dir = str(ensure_dir(self._dir / "llm_events"))
+        self._session_dir = str(ensure_dir(self._dir / "sessions"))
+        self._agg_dir = str(self._dir / "tool_agg")
+        self._reservoir_dir = str(self._dir / "tool_reservoir")
+        for log_dir, ts_key in (
+            (self._tool_dir, "ts"),
+            (self._llm_dir, "ts"),
+            (self._session_dir, "ended_at"),
+        ):
+            self._migrate_single_file(log_dir, ts_key)
 
     # -- public API ----------------------------------------------------------
 
     def record_tool_event(self, event: ToolEvent) -> None:
-        self._append(self._tool_path, event.to_dict())
+        if self.sampling == "full":
+            self._append(self._tool_dir, event.ts, event.to_dict())
+        else:
+            self._sample_tool_event(event)
 
     def record_llm_event(self, event: LLMEvent) -> None:
-        self._append(self._llm_path, event.to_dict())
+        self._append(self._llm_dir, event.ts, event.to_dict())
 
     def record_session(self, summary: SessionSummary) -> None:
-        self._append(self._session_path, summary.to_dict())
+        self._append(self._session_dir, summary.ended_at, summary.to_dict())
+        self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered records and sampled tool statistics to disk."""
+        self._flush_records()
+        self._snapshot_tool_state()
 
     # -- reading (used by report.py) -----------------------------------------
 
     def read_tool_events(self, limit: int = 0) -> list[dict]:
-        return self._read(self._tool_path, limit)
+        return self._read(self._tool_dir, limit)
 
     def read_llm_events(self, limit: int = 0) -> list[dict]:
-        return self._read(self._llm_path, limit)
+        return self._read(self._llm_dir, limit)
 
     def read_sessions(self, limit: int = 0) -> list[dict]:
-        return self._read(self._session_path, limit)
+        return self._read(self._session_dir, limit)
+
+    def iter_tool_events(self, since: float | None = None) -> Iterator[dict]:
+        """Stream tool events, starting at the first one at or after epoch *since*."""
+        return self._iter(self._tool_dir, since, "ts")
+
+    def iter_llm_events(self, since: float | None = None) -> Iterator[dict]:
+        return self._iter(self._llm_dir, since, "ts")
+
+    def iter_sessions(self, since: float | None = None) -> Iterator[dict]:
+        return self._iter(self._session_dir, since, "ended_at")
+
+    def iter_tool_events_typed(self, since: float | None = None) -> Iterator[ToolEvent]:
+        """Like iter_tool_events(), but yielding ToolEvent records."""
+        return map(ToolEvent.from_dict, self.iter_tool_events(since))
+
+    def iter_llm_events_typed(self, since: float | None = None) -> Iterator[LLMEvent]:
+        return map(LLMEvent.from_dict, self.iter_llm_events(since))
+
+    def iter_sessions_typed(self, since: float | None = None) -> Iterator[SessionSummary]:
+        return map(SessionSummary.from_dict, self.iter_sessions(since))
+
+    def read_tool_stats(self, since: float | None = None) -> dict[str, list]:
+        """Per-tool ``[calls, ok, latency, input, output, errors]`` from sampled modes.
+
+        Days overlapping *since* are included whole.  Reservoir samples are
+        scaled up to the number of events seen.
+        """
+        if self._state_dirty:
+            self._snapshot_tool_state()
+        stats: dict[str, list] = {}
+        for path in self._day_files(self._agg_dir, since):
+            for name, acc in self._load_snapshot(path).items():
+                merge_tool_stats(stats, name, acc)
+        for path in self._day_files(self._reservoir_dir, since):
+            for name, (seen, sample) in self._load_snapshot(path).items():
+                acc: list = [0, 0, 0, 0, 0, {}]
+                for event in sample:
+                    self._add_tool_event(acc, event)
+                scale = seen / len(sample) if sample else 0
+                scaled = [seen] + [round(v * scale) for v in acc[1:5]]
+                scaled.append({k: round(v * scale) for k, v in acc[5].items()})
+                merge_tool_stats(stats, name, scaled)
+        return stats
 
     @property
     def metrics_dir(self) -> Path:
@@ -60,28 +260,277 @@ class MetricsCollector:
 
     # -- internals -----------------------------------------------------------
 
-    def _append(self, path: Path, data: dict) -> None:
+    @staticmethod
+    def _day(ts: str) -> str:
+        day = ts[:10]
+        try:
+            date.fromisoformat(day)
+        except (TypeError, ValueError):
+            return date.today().isoformat()
+        return day
+
+    @staticmethod
+    def _day_files(log_dir: str, since: float | None = None) -> list[str]:
+        """Day files of a log, oldest first; only days overlapping *since* onwards."""
+        try:
+            names = sorted(n for n in os.listdir(log_dir) if n.endswith(".msgpack"))
+        except FileNotFoundError:
+            return []
+        if since is not None:
+            first = datetime.fromtimestamp(since).date().isoformat()
+            names = names[bisect.bisect_left(names, first) :]
+        return [os.path.join(log_dir, n) for n in names]
+
+    def _append(self, log_dir: str, ts: str, data: dict) -> None:
         if not self.enabled:
             return
+        path = os.path.join(log_dir, self._day(ts) + ".msgpack")
         try:
-            with open(path, "a") as f:
-                f.write(json.dumps(data, ensure_ascii=False) + "\n")
+            buf = msgpack.packb(data)
         except Exception as e:
-            logger.warning(f"Metrics write failed ({path.name}): {e}")
+            _logger().warning(f"Metrics write failed ({os.path.basename(log_dir)}): {e}")
+            return
+        with self._lock:
+            self._pending.setdefault(path, []).append(_FRAME.pack(len(buf)) + buf)
+            self._pending_count += 1
+            full = self._pending_count >= BUFFER_LIMIT
+            self._start_flusher()
+        if full:
+            self._wake.set()
+
+    def _start_flusher(self) -> None:
+        # Caller holds self._lock.
+        if self._flusher is None:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="metrics-flush", daemon=True
+            )
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self._flush_records()
+            if time.monotonic() - self._last_snapshot >= SNAPSHOT_INTERVAL:
+                self._snapshot_tool_state()
+
+    def _flush_records(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_count = 0
+            for path, frames in pending.items():
+                try:
+                    with open(path, "ab") as f:
+                        f.write(b"".join(frames))
+                except Exception as e:
+                    _logger().warning(f"Metrics write failed ({os.path.basename(path)}): {e}")
+
+    # -- sampled tool statistics ---------------------------------------------
+
+    def _state_dir(self) -> str:
+        return self._agg_dir if self.sampling == "aggregate" else self._reservoir_dir
 
     @staticmethod
-    def _read(path: Path, limit: int = 0) -> list[dict]:
-        if not path.exists():
-            return []
-        lines: list[dict] = []
+    def _add_tool_event(acc: list, event: dict) -> None:
+        acc[0] += 1
+        if event.get("tool_success"):
+            acc[1] += 1
+        acc[2] += event.get("latency_ms") or 0
+        acc[3] += event.get("input_size") or 0
+        acc[4] += event.get("output_size") or 0
+        err = event.get("error")
+        if err:
+            key = err[:120]
+            acc[5][key] = acc[5].get(key, 0) + 1
+
+    def _sample_tool_event(self, event: ToolEvent) -> None:
+        if not self.enabled:
+            return
+        day = self._day(event.ts)
+        with self._lock:
+            tools = self._tool_state.setdefault(day, {})
+            if self.sampling == "aggregate":
+                acc = tools.get(event.tool_name)
+                if acc is None:
+                    acc = tools[event.tool_name] = [0, 0, 0, 0, 0, {}]
+                self._add_tool_event(acc, event.to_dict())
+            else:
+                # Algorithm R: every event seen so far is kept with equal probability.
+                entry = tools.setdefault(event.tool_name, [0, []])
+                entry[0] += 1
+                sample = entry[1]
+                if len(sample) < self._reservoir_size:
+                    sample.append(event.to_dict())
+                else:
+                    j = random.randrange(entry[0])
+                    if j < self._reservoir_size:
+                        sample[j] = event.to_dict()
+            self._state_dirty = True
+            self._start_flusher()
+
+    def _snapshot_tool_state(self) -> None:
+        with self._lock:
+            if not self._state_dirty:
+                return
+            state_dir = self._state_dir()
+            try:
+                os.makedirs(state_dir, exist_ok=True)
+                with _file_lock(os.path.join(state_dir, ".lock")):
+                    for day, delta in list(self._tool_state.items()):
+                        path = os.path.join(state_dir, day + ".msgpack")
+                        tools = self._load_snapshot(path)
+                        for name, entry in delta.items():
+                            if self.sampling == "aggregate":
+                                merge_tool_stats(tools, name, entry)
+                            elif name in tools:
+                                merge_reservoirs(tools[name], entry, self._reservoir_size)
+                            else:
+                                tools[name] = entry
+                        tmp = f"{path}.{os.getpid()}.tmp"
+                        with open(tmp, "wb") as f:
+                            f.write(msgpack.packb(tools))
+                        os.replace(tmp, path)
+                        del self._tool_state[day]  # merged; never add it twice
+            except Exception as e:
+                _logger().warning(f"Metrics snapshot failed ({os.path.basename(state_dir)}): {e}")
+                return
+            self._state_dirty = False
+            self._last_snapshot = time.monotonic()
+
+    @staticmethod
+    def _load_snapshot(path: str) -> dict[str, list]:
         try:
-            with open(path) as f:
-                for raw in f:
-                    raw = raw.strip()
-                    if raw:
-                        lines.append(json.loads(raw))
+            with open(path, "rb") as f:
+                return msgpack.unpackb(f.read())
+        except FileNotFoundError:
+            return {}
         except Exception as e:
-            logger.warning(f"Metrics read failed ({path.name}): {e}")
+            _logger().warning(f"Metrics read failed ({os.path.basename(path)}): {e}")
+            return {}
+
+    def _read(self, log_dir: str, limit: int = 0, since: float | None = None) -> list[dict]:
+        if self._pending_count:
+            self.flush()
+        files = self._day_files(log_dir, since)
+        if limit <= 0:
+            return [r for path in files for r in self._read_file(path)]
+        # Walk back from the newest day until enough records are collected.
+        chunks: list[list[dict]] = []
+        need = limit
+        for path in reversed(files):
+            chunk = self._read_file(path, need)
+            chunks.append(chunk)
+            need -= len(chunk)
+            if need <= 0:
+                break
+        return [r for chunk in reversed(chunks) for r in chunk]
+
+    def _read_file(self, path: str, limit: int = 0) -> list[dict]:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return []
+        with f:
+            st = os.fstat(f.fileno())
+            cached = self._cache.get(path)
+            if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+                lines = cached[2]
+            else:
+                try:
+                    lines = self._decode(f.read(), limit)
+                except Exception as e:
+                    _logger().warning(f"Metrics read failed ({os.path.basename(path)}): {e}")
+                    return []
+                if limit > 0:
+                    return lines
+                self._cache[path] = (st.st_mtime_ns, st.st_size, lines)
+        return lines[-limit:] if limit > 0 else lines
+
+    def _iter(self, log_dir: str, since: float | None, ts_key: str) -> Iterator[dict]:
+        if self._pending_count:
+            self.flush()
+        for path in self._day_files(log_dir, since):
+            for record in self._iter_file(path):
+                if since is not None:
+                    if ts_epoch(record.get(ts_key, "")) < since:
+                        continue
+                    since = None  # records are appended in time order
+                yield record
+
+    @staticmethod
+    def _iter_file(path: str) -> Iterator[dict]:
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            read, unpack_from, header = f.read, _FRAME.unpack_from, _FRAME.size
+            unpackb = msgpack.unpackb
+            while len(head := read(header)) == header:
+                size = unpack_from(head)[0]
+                buf = read(size)
+                if len(buf) < size:
+                    return  # torn write at the end of the file
+                try:
+                    yield unpackb(buf)
+                except Exception as e:
+                    _logger().warning(f"Metrics read failed ({os.path.basename(path)}): {e}")
+                    return
+
+    @staticmethod
+    def _frames(data: bytes) -> list[tuple[int, int]]:
+        """Return (start, end) spans of the complete records in *data*."""
+        spans: list[tuple[int, int]] = []
+        unpack_from, header = _FRAME.unpack_from, _FRAME.size
+        pos, size = 0, len(data)
+        while pos + header <= size:
+            start = pos + header
+            end = start + unpack_from(data, pos)[0]
+            if end > size:
+                break  # torn write at the end of the file
+            spans.append((start, end))
+            pos = end
+        return spans
+
+    @classmethod
+    def _decode(cls, data: bytes, limit: int = 0) -> list[dict]:
+        """Decode the last *limit* records (all when 0), skipping over the rest."""
+        spans = cls._frames(data)
         if limit > 0:
-            lines = lines[-limit:]
-        return lines
+            spans = spans[-limit:]
+        view = memoryview(data)
+        unpackb = msgpack.unpackb
+        return [unpackb(view[start:end]) for start, end in spans]
+
+    @classmethod
+    def _migrate_single_file(cls, log_dir: str, ts_key: str) -> None:
+        """Split the pre-partitioning ``<log>.jsonl`` / ``<log>.msgpack`` into day files."""
+        base = Path(log_dir)
+        legacy = [p for p in (base.with_suffix(".jsonl"), base.with_suffix(".msgpack")) if p.exists()]
+        if not legacy:
+            return
+        try:
+            by_day: dict[str, list[bytes]] = {}
+            for path in legacy:  # JSONL predates the single msgpack file
+                data = path.read_bytes()
+                if path.suffix == ".jsonl":
+                    records = [fastjson.loads(raw) for raw in data.splitlines() if raw.strip()]
+                else:
+                    records = cls._decode(data)
+                for record in records:
+                    buf = msgpack.packb(record)
+                    day = cls._day(str(record.get(ts_key) or ""))
+                    by_day.setdefault(day, []).append(_FRAME.pack(len(buf)) + buf)
+            for day, frames in by_day.items():
+                target = base / f"{day}.msgpack"
+                # Migrated events predate anything already in the day file.
+                if target.exists():
+                    frames.append(target.read_bytes())
+                tmp = target.with_suffix(".msgpack.tmp")
+                tmp.write_bytes(b"".join(frames))
+                os.replace(tmp, target)
+            for path in legacy:
+                path.unlink()
+        except Exception as e:
+            _logger().warning(f"Metrics migration failed ({base.name}): {e}")
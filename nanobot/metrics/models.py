@@ -1,11 +1,45 @@
 """Data models for metrics events."""
 
-from dataclasses import dataclass, field, asdict
+import functools
+from dataclasses import MISSING, dataclass, field, fields
 from datetime import datetime
+from operator import attrgetter
 from typing import Any
 
 
-@dataclass
+@functools.cache
+def _field_getter(cls: type) -> tuple[tuple[str, ...], attrgetter]:
+    names = tuple(f.name for f in fields(cls))
+    return names, attrgetter(*names)
+
+
+@functools.cache
+def _field_defaults(cls: type) -> tuple[tuple[str, Any, Any], ...]:
+    return tuple(
+        (f.name, None if f.default is MISSING else f.default, f.default_factory)
+        for f in fields(cls)
+    )
+
+
+def _from_dict(cls: type, data: dict[str, Any]) -> Any:
+    """Build a record from a stored dict without running the dataclass __init__."""
+    obj = object.__new__(cls)
+    get = data.get
+    for name, default, factory in _field_defaults(cls):
+        if factory is not MISSING and name not in data:
+            setattr(obj, name, factory())
+        else:
+            setattr(obj, name, get(name, default))
+    return obj
+
+
+def _as_dict(obj: Any) -> dict[str, Any]:
+    """Shallow field dict; unlike asdict(), nested lists are not copied."""
+    names, getter = _field_getter(type(obj))
+    return dict(zip(names, getter(obj)))
+
+
+@dataclass(slots=True)
 class ToolEvent:
     """A single tool invocation record."""
 
@@ -20,10 +54,14 @@ class ToolEvent:
     iteration: int = 0  # which loop iteration this tool call belongs to
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        return _as_dict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "ToolEvent":
+        return _from_dict(cls, data)
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMEvent:
     """A single LLM API call record."""
 
@@ -40,10 +78,14 @@ class LLMEvent:
     finish_reason: str = "stop"
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        return _as_dict(self)
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LLMEvent":
+        return _from_dict(cls, data)
 
-@dataclass
+
+@dataclass(slots=True)
 class SessionSummary:
     """End-of-session aggregate record."""
 
@@ -65,4 +107,8 @@ class SessionSummary:
     model: str = ""
 
     def to_dict(self) -> dict[str, Any]:
-        return asdict(self)
+        return _as_dict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SessionSummary":
+        return _from_dict(cls, data)
@@ -1,15 +1,26 @@
 """Aggregation and reporting helpers for collected metrics.
 
-All functions operate on plain dicts read from JSONL — no pandas needed.
+All functions operate on plain dicts read from the metrics logs — no pandas needed.
+Large histories are reduced with NumPy when it is installed.
 """
 
 from __future__ import annotations
 
-from collections import Counter, defaultdict
-from datetime import datetime, timedelta
+import functools
+import heapq
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Any
 
-from nanobot.metrics.collector import MetricsCollector
+from nanobot.metrics.collector import MetricsCollector, merge_tool_stats
+
+# Below this many sessions, building NumPy arrays costs more than it saves.
+NUMPY_MIN_ROWS = 5000
+
+# Column order of the matrix built by _session_matrix().
+_SUCCESS, _PROMPT, _COMPLETION, _TOTAL, _ITERATIONS = range(5)
 
 
 # ---------------------------------------------------------------------------
@@ -17,10 +28,47 @@ from nanobot.metrics.collector import MetricsCollector
 # ---------------------------------------------------------------------------
 
 
-def _since(events: list[dict], hours: float) -> list[dict]:
-    """Return events from the last *hours* hours."""
-    cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
-    return [e for e in events if e.get("ts", "") >= cutoff]
+@functools.lru_cache(maxsize=1)
+def _numpy():
+    """Import NumPy on first use; None when it is not installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@functools.lru_cache(maxsize=1)
+def _group_sums():
+    """The numba-compiled group-by kernel, or None without numba."""
+    from nanobot.metrics._agg import group_sums
+
+    return group_sums
+
+
+def _numpy_for(rows: list[dict]):
+    return _numpy() if len(rows) >= NUMPY_MIN_ROWS else None
+
+
+def _cutoff(hours: float) -> float:
+    return time.time() - hours * 3600
+
+
+def _session_matrix(np, sessions: list[dict]):
+    """Pack the numeric session fields into an (n, 5) int64 array."""
+    return np.array(
+        [
+            (
+                1 if s.get("success") else 0,
+                s.get("total_prompt_tokens", 0),
+                s.get("total_completion_tokens", 0),
+                s.get("total_tokens", 0),
+                s.get("total_iterations", 0),
+            )
+            for s in sessions
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 5)
 
 
 # ---------------------------------------------------------------------------
@@ -31,29 +79,55 @@ def _since(events: list[dict], hours: float) -> list[dict]:
 def summary_report(collector: MetricsCollector, hours: float = 24) -> dict[str, Any]:
     """High-level summary over the last *hours* hours.
 
+    Events are streamed from disk and only in-window sessions are kept.
     Returns a dict with sections: overview, tokens, tools, model.
     """
-    sessions = _since(collector.read_sessions(), hours)
-    llm_events = _since(collector.read_llm_events(), hours)
-    tool_events = _since(collector.read_tool_events(), hours)
+    cutoff = _cutoff(hours)
+
+    def window_sessions() -> list[dict]:
+        return list(collector.iter_sessions(since=cutoff))
+
+    def count_llm_calls() -> int:
+        return sum(1 for _ in collector.iter_llm_events(since=cutoff))
+
+    def tally_tool_calls() -> tuple[int, int]:
+        calls = ok = 0
+        for t in collector.iter_tool_events(since=cutoff):
+            calls += 1
+            if t.get("tool_success"):
+                ok += 1
+        for acc in collector.read_tool_stats(since=cutoff).values():
+            calls += acc[0]
+            ok += acc[1]
+        return calls, ok
+
+    # The three logs are independent files: overlap their reads.
+    jobs = (window_sessions, count_llm_calls, tally_tool_calls)
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [pool.submit(job) for job in jobs]
+        results = [f.result() for f in futures]
+    sessions, llm_calls, (total_tool_calls, tool_success_count) = results
+
+    success_count = total_prompt = total_completion = total_tokens = iterations = 0
+    np = _numpy_for(sessions)
+    if np is not None:
+        totals = _session_matrix(np, sessions).sum(axis=0)
+        success_count, total_prompt, total_completion, total_tokens, iterations = map(int, totals)
+    else:
+        for s in sessions:
+            if s.get("success"):
+                success_count += 1
+            total_prompt += s.get("total_prompt_tokens", 0)
+            total_completion += s.get("total_completion_tokens", 0)
+            total_tokens += s.get("total_tokens", 0)
+            iterations += s.get("total_iterations", 0)
 
     total_sessions = len(sessions)
-    success_count = sum(1 for s in sessions if s.get("success"))
     success_rate = (success_count / total_sessions * 100) if total_sessions else 0.0
-
-    total_prompt = sum(e.get("total_prompt_tokens", 0) for e in sessions)
-    total_completion = sum(e.get("total_completion_tokens", 0) for e in sessions)
-    total_tokens = sum(e.get("total_tokens", 0) for e in sessions)
     avg_tokens = (total_tokens // total_sessions) if total_sessions else 0
     tokens_per_success = (total_tokens // success_count) if success_count else 0
-
-    total_tool_calls = len(tool_events)
-    tool_success_count = sum(1 for t in tool_events if t.get("tool_success"))
     tool_success_rate = (tool_success_count / total_tool_calls * 100) if total_tool_calls else 0.0
-
-    avg_iterations = 0.0
-    if total_sessions:
-        avg_iterations = sum(s.get("total_iterations", 0) for s in sessions) / total_sessions
+    avg_iterations = (iterations / total_sessions) if total_sessions else 0.0
 
     return {
         "period_hours": hours,
@@ -73,7 +147,7 @@ def summary_report(collector: MetricsCollector, hours: float = 24) -> dict[str,
             "total_calls": total_tool_calls,
             "success_rate": round(tool_success_rate, 1),
         },
-        "llm_calls": len(llm_events),
+        "llm_calls": llm_calls,
     }
 
 
@@ -84,22 +158,35 @@ def summary_report(collector: MetricsCollector, hours: float = 24) -> dict[str,
 
 def tool_report(collector: MetricsCollector, hours: float = 24) -> list[dict[str, Any]]:
     """Per-tool success rate, avg latency, and call count."""
-    events = _since(collector.read_tool_events(), hours)
-    by_tool: dict[str, list[dict]] = defaultdict(list)
-    for e in events:
-        by_tool[e.get("tool_name", "?")].append(e)
+    # tool -> [calls, ok, latency, input, output, errors]
+    by_tool: dict[str, list[Any]] = {}
+    for e in collector.iter_tool_events_typed(since=_cutoff(hours)):
+        name = e.tool_name or "?"
+        acc = by_tool.get(name)
+        if acc is None:
+            acc = by_tool[name] = [0, 0, 0, 0, 0, {}]
+        acc[0] += 1
+        if e.tool_success:
+            acc[1] += 1
+        acc[2] += e.latency_ms or 0
+        acc[3] += e.input_size or 0
+        acc[4] += e.output_size or 0
+        err = e.error
+        if err:
+            key = err[:120]
+            errors = acc[5]
+            errors[key] = errors.get(key, 0) + 1
+
+    for name, acc in collector.read_tool_stats(since=_cutoff(hours)).items():
+        merge_tool_stats(by_tool, name, acc)
 
     rows: list[dict[str, Any]] = []
-    for name, evts in sorted(by_tool.items(), key=lambda kv: -len(kv[1])):
-        total = len(evts)
-        ok = sum(1 for e in evts if e.get("tool_success"))
-        avg_lat = sum(e.get("latency_ms", 0) for e in evts) // max(total, 1)
-        avg_in = sum(e.get("input_size", 0) for e in evts) // max(total, 1)
-        avg_out = sum(e.get("output_size", 0) for e in evts) // max(total, 1)
-
-        # Collect unique errors
-        errors = Counter(e.get("error", "")[:120] for e in evts if e.get("error"))
-
+    for name, (total, ok, lat, size_in, size_out, errors) in sorted(
+        by_tool.items(), key=lambda kv: -kv[1][0]
+    ):
+        avg_lat = lat // max(total, 1)
+        avg_in = size_in // max(total, 1)
+        avg_out = size_out // max(total, 1)
         rows.append(
             {
                 "tool": name,
@@ -108,7 +195,7 @@ def tool_report(collector: MetricsCollector, hours: float = 24) -> list[dict[str
                 "avg_latency_ms": avg_lat,
                 "avg_input_size": avg_in,
                 "avg_output_size": avg_out,
-                "top_errors": dict(errors.most_common(3)),
+                "top_errors": dict(heapq.nlargest(3, errors.items(), key=itemgetter(1))),
             }
         )
     return rows
@@ -148,16 +235,39 @@ def session_report(collector: MetricsCollector, last_n: int = 20) -> list[dict[s
 
 def model_report(collector: MetricsCollector, hours: float = 168) -> list[dict[str, Any]]:
     """Per-model token efficiency and success rate (default: last 7 days)."""
-    sessions = _since(collector.read_sessions(), hours)
-    by_model: dict[str, list[dict]] = defaultdict(list)
-    for s in sessions:
-        by_model[s.get("model", "?")].append(s)
+    sessions = list(collector.iter_sessions(since=_cutoff(hours)))
+
+    # model -> (sessions, successes, tokens)
+    stats: dict[str, tuple[int, int, int]] = {}
+    np = _numpy_for(sessions)
+    if np is not None:
+        ids: dict[str, int] = {}
+        model_ids = np.fromiter(
+            (ids.setdefault(s.get("model", "?"), len(ids)) for s in sessions),
+            dtype=np.intp,
+            count=len(sessions),
+        )
+        matrix = _session_matrix(np, sessions)
+        group_sums = _group_sums()
+        if group_sums is not None:
+            counts, sums = group_sums(model_ids, matrix, len(ids))
+        else:
+            order = np.argsort(model_ids, kind="stable")
+            starts = np.flatnonzero(np.diff(model_ids[order], prepend=-1))
+            sums = np.add.reduceat(matrix[order], starts, axis=0)
+            counts = np.diff(starts, append=len(sessions))
+        for model, i in ids.items():
+            stats[model] = (int(counts[i]), int(sums[i, _SUCCESS]), int(sums[i, _TOTAL]))
+    else:
+        by_model: dict[str, list[dict]] = defaultdict(list)
+        for s in sessions:
+            by_model[s.get("model", "?")].append(s)
+        for model, ss in by_model.items():
+            ok = sum(1 for s in ss if s.get("success"))
+            stats[model] = (len(ss), ok, sum(s.get("total_tokens", 0) for s in ss))
 
     rows: list[dict[str, Any]] = []
-    for model, ss in sorted(by_model.items()):
-        total = len(ss)
-        ok = sum(1 for s in ss if s.get("success"))
-        tokens = sum(s.get("total_tokens", 0) for s in ss)
+    for model, (total, ok, tokens) in sorted(stats.items()):
         rows.append(
             {
                 "model": model,
@@ -0,0 +1,57 @@
+"""HTTP clients bound to the event loop that uses them."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class LoopClients:
+    """One ``httpx.AsyncClient`` per event loop.
+
+    Pooled connections belong to the loop that opened them, so a client is
+    never handed to another loop.  A client holds its loop alive, so entries
+    are not weak: clients of loops that have closed since are dropped when the
+    next client is created, and their sockets are released with them.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        self._factory = factory
+        self._clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def get(self) -> httpx.AsyncClient:
+        """Return the running loop's client, creating it if needed."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            for stale in [other for other in self._clients if other.is_closed()]:
+                del self._clients[stale]
+            client = self._clients[loop] = self._factory()
+        return client
+
+    async def aclose(self) -> None:
+        """Close the running loop's client and forget every other one.
+
+        Clients of loops still running in other threads are closed on their
+        own loop; the rest cannot be awaited from here.
+        """
+        current = asyncio.get_running_loop()
+        clients, self._clients = self._clients, {}
+        for loop, client in clients.items():
+            if client.is_closed:
+                continue
+            if loop is current:
+                try:
+                    await client.aclose()
+                except Exception:
+                    logger.debug("Failed to close HTTP client", exc_info=True)
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
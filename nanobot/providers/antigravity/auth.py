@@ -2,32 +2,132 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
 import base64
 import hashlib
-import json
+import hmac
+import os
 import secrets
+import selectors
+import socket
 import time
 import webbrowser
-from dataclasses import asdict, dataclass, fields
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import MISSING, asdict, dataclass, fields
 from pathlib import Path
-from typing import Any
-from urllib.parse import parse_qs, urlencode, urlparse
+from typing import Any, ClassVar
+from urllib.parse import parse_qsl, urlencode, urlparse
 
 import httpx
 
+from nanobot.providers.antigravity._http import LoopClients
 from nanobot.providers.antigravity.constants import (
     AUTH_URL,
     CLIENT_ID,
     CLIENT_SECRET,
-    CREDENTIALS_DIR,
     CREDENTIALS_FILE,
+    CREDENTIALS_PATH,
     OAUTH_REDIRECT_PORT,
     OAUTH_REDIRECT_URI,
-    SCOPES,
+    STATIC_AUTH_QUERY,
     TOKEN_URL,
     USERINFO_URL,
 )
+from nanobot.utils import fastjson
+
+_CALLBACK_PATH = urlparse(OAUTH_REDIRECT_URI).path
+_CALLBACK_TIMEOUT = 120.0  # seconds
+
+
+def _http_response(status: str, body: bytes = b"") -> bytes:
+    head = (
+        f"HTTP/1.1 {status}\r\nContent-Type: text/html\r\n"
+        f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+_SUCCESS_RESPONSE = _http_response(
+    "200 OK",
+    b"<h1>Authentication successful!</h1>"
+    b"<p>You can close this tab and return to the terminal.</p>",
+)
+_FAILURE_RESPONSE = _http_response(
+    "200 OK", b"<h1>Authentication failed</h1><p>You can close this tab.</p>"
+)
+_BAD_REQUEST_RESPONSE = _http_response("400 Bad Request")
+_NOT_FOUND_RESPONSE = _http_response("404 Not Found")
+
+
+def _id_token_email(id_token: str) -> str:
+    """Return the ``email`` claim of an (unverified) id_token JWT, or ``""``.
+
+    The token comes straight from Google's token endpoint over TLS, so the
+    signature is not checked here.
+    """
+    try:
+        payload = id_token.split(".")[1]
+        claims = fastjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return claims.get("email", "") if isinstance(claims, dict) else ""
+    except (IndexError, ValueError):
+        return ""
+
+
+def _read_request_target(conn: socket.socket) -> str:
+    """Read an HTTP request head and return its request-target."""
+    data = b""
+    while b"\r\n\r\n" not in data and len(data) < 65536:
+        chunk = conn.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    parts = data.partition(b"\r\n")[0].split(b" ", 2)
+    return parts[1].decode("latin-1") if len(parts) == 3 else ""
+
+
+def _wait_for_callback(
+    server: socket.socket, state: str, timeout: float = _CALLBACK_TIMEOUT
+) -> tuple[str | None, str | None]:
+    """Serve the redirect URI until the OAuth callback arrives.
+
+    Returns ``(auth_code, error)``.  The timeout is an overall deadline,
+    not a per-connection one; stray requests (e.g. favicon) get a 404.
+    """
+    deadline = time.monotonic() + timeout
+    with selectors.DefaultSelector() as sel:
+        sel.register(server, selectors.EVENT_READ)
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not sel.select(remaining):
+                break
+            try:
+                conn, _ = server.accept()
+            except BlockingIOError:
+                continue
+            with conn:
+                conn.settimeout(min(remaining, 10.0))
+                try:
+                    target = urlparse(_read_request_target(conn))
+                    if target.path != _CALLBACK_PATH:
+                        conn.sendall(_NOT_FOUND_RESPONSE)
+                        continue
+                    query = dict(parse_qsl(target.query, keep_blank_values=True))
+
+                    if "error" in query:
+                        conn.sendall(_FAILURE_RESPONSE)
+                        return None, query["error"]
+
+                    received_state = query.get("state")
+                    if not received_state or not hmac.compare_digest(received_state, state):
+                        conn.sendall(_BAD_REQUEST_RESPONSE)
+                        return None, "State mismatch"
+
+                    conn.sendall(_SUCCESS_RESPONSE)
+                    return query.get("code"), None
+                except OSError:
+                    continue
+    return None, "Timed out waiting for the OAuth callback"
 
 
 @dataclass
@@ -39,6 +139,9 @@ class AntigravityCredentials:
     expires_at: float  # Unix timestamp
     email: str = ""
 
+    _VALID_KEYS: ClassVar[frozenset[str]]
+    _REQUIRED_KEYS: ClassVar[frozenset[str]]
+
     @property
     def is_expired(self) -> bool:
         """Check if access token is expired (with 5-minute buffer)."""
@@ -49,8 +152,18 @@ class AntigravityCredentials:
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> AntigravityCredentials:
-        valid_keys = {f.name for f in fields(cls)}
-        return cls(**{k: v for k, v in data.items() if k in valid_keys})
+        return cls(**{k: data[k] for k in cls._VALID_KEYS if k in data})
+
+    @classmethod
+    def is_valid(cls, data: Any) -> bool:
+        """Whether *data* has every field ``from_dict`` needs."""
+        return isinstance(data, dict) and cls._REQUIRED_KEYS <= data.keys()
+
+
+AntigravityCredentials._VALID_KEYS = frozenset(f.name for f in fields(AntigravityCredentials))
+AntigravityCredentials._REQUIRED_KEYS = frozenset(
+    f.name for f in fields(AntigravityCredentials) if f.default is MISSING
+)
 
 
 class AntigravityAuthManager:
@@ -71,16 +184,32 @@ class AntigravityAuthManager:
     """
 
     def __init__(self, credentials_dir: Path | None = None):
-        self._creds_dir = credentials_dir or (Path.home() / CREDENTIALS_DIR)
-        self._creds_file = self._creds_dir / CREDENTIALS_FILE
+        self._creds_file = credentials_dir / CREDENTIALS_FILE if credentials_dir else CREDENTIALS_PATH
         self._accounts: dict[str, AntigravityCredentials] = {}
         self._active_email: str = ""
-        self._load()
+        self._refresh_lock: asyncio.Lock | None = None
+        # Monotonic deadline before which the active token is known to be valid.
+        self._valid_until = 0.0
+        self._dirty = False
+        self._last_save = 0.0
+        self._batch_depth = 0
+        self._flush_registered = False
+        # Credentials are read on first use, not at construction.
+        self._loaded = False
+        # Token refreshes reuse a keep-alive pool, one per event loop: login()
+        # runs its own loop next to the caller's.
+        self._clients = LoopClients(
+            lambda: httpx.AsyncClient(
+                limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+                timeout=10.0,
+            )
+        )
 
     # ── Properties ─────────────────────────────────────────────────────
 
     @property
     def is_authenticated(self) -> bool:
+        self._ensure_loaded()
         return self._active_email != "" and self._active_email in self._accounts
 
     @property
@@ -90,54 +219,127 @@ class AntigravityAuthManager:
     @property
     def accounts(self) -> list[str]:
         """Return list of all stored account emails."""
+        self._ensure_loaded()
         return list(self._accounts.keys())
 
     @property
     def active_credentials(self) -> AntigravityCredentials | None:
         """Return credentials for the active account."""
+        self._ensure_loaded()
         return self._accounts.get(self._active_email)
 
     # ── Persistence ────────────────────────────────────────────────────
 
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._loaded = True
+            self._load()
+
     def _load(self) -> None:
         """Load credentials from disk.  Handles both legacy and multi-account formats."""
-        if not self._creds_file.exists():
+        try:
+            data = fastjson.loads(self._creds_file.read_bytes())
+        except (ValueError, OSError):
             return
 
-        try:
-            data = json.loads(self._creds_file.read_text())
-        except (json.JSONDecodeError, OSError):
+        if not isinstance(data, dict):
             return
+        for key, handler in self._SCHEMA_DISPATCH:
+            if key in data:
+                handler(self, data)
+                break
+
+    def _load_multi(self, data: dict[str, Any]) -> None:
+        """Multi-account format."""
+        self._active_email = data.get("active", "")
+        accounts = data["accounts"]
+        if not isinstance(accounts, dict):
+            return
+        for email, creds_data in accounts.items():
+            if AntigravityCredentials.is_valid(creds_data):
+                self._accounts[email] = AntigravityCredentials.from_dict(creds_data)
 
-        if "accounts" in data:
-            # Multi-account format
-            self._active_email = data.get("active", "")
-            for email, creds_data in data.get("accounts", {}).items():
-                try:
-                    self._accounts[email] = AntigravityCredentials.from_dict(creds_data)
-                except (TypeError, KeyError):
-                    continue
-        elif "access_token" in data:
-            # Legacy single-credential format — migrate
-            try:
-                creds = AntigravityCredentials.from_dict(data)
-                email = creds.email or "unknown"
-                self._accounts[email] = creds
-                self._active_email = email
-                # Persist in new format
-                self._save()
-            except (TypeError, KeyError):
-                pass
+    def _load_legacy(self, data: dict[str, Any]) -> None:
+        """Legacy single-credential format — migrate."""
+        if not AntigravityCredentials.is_valid(data):
+            return
+        creds = AntigravityCredentials.from_dict(data)
+        email = creds.email or "unknown"
+        self._accounts[email] = creds
+        self._active_email = email
+        # Persist in new format
+        self._save()
+
+    # Top-level key that identifies each on-disk format, checked in order.
+    _SCHEMA_DISPATCH = (("accounts", _load_multi), ("access_token", _load_legacy))
 
     def _save(self) -> None:
-        """Save all credentials to disk in multi-account format."""
-        self._creds_dir.mkdir(parents=True, exist_ok=True)
+        """Save all credentials to disk in multi-account format.
+
+        Written to a temp file created with mode 0600 and renamed into place,
+        so a crash mid-write never leaves a truncated ``credentials.json``.
+        """
+        self._creds_file.parent.mkdir(parents=True, exist_ok=True)
         data = {
             "active": self._active_email,
             "accounts": {email: creds.to_dict() for email, creds in self._accounts.items()},
         }
-        self._creds_file.write_text(json.dumps(data, indent=2))
-        self._creds_file.chmod(0o600)
+        payload = fastjson.dumps(data, indent=True)
+        tmp = self._creds_file.with_name(self._creds_file.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, self._creds_file)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def _mark_dirty(self, *, token_changed: bool = False) -> None:
+        """Record an in-memory change and save it unless writes are being coalesced.
+
+        New tokens are saved at once: a process killed before a deferred write
+        would otherwise lose them and force a new login.
+        """
+        self._dirty = True
+        if token_changed:
+            self._save()
+        else:
+            self._maybe_save()
+
+    def _maybe_save(self) -> None:
+        """Save if dirty, at most once a second and never inside ``batch()``."""
+        if not self._dirty or self._batch_depth:
+            return
+        if time.monotonic() - self._last_save > 1.0:
+            self._save()
+        elif not self._flush_registered:
+            # Deferred change: make sure it reaches disk before exit.
+            atexit.register(self.flush)
+            self._flush_registered = True
+
+    def flush(self) -> None:
+        """Write pending changes to disk."""
+        if self._dirty:
+            self._save()
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Suppress writes inside the block and save once on exit."""
+        self._batch_depth += 1
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.flush()
+
+    # ── HTTP client ────────────────────────────────────────────────────
+
+    def _get_client(self) -> httpx.AsyncClient:
+        return self._clients.get()
+
+    async def close(self) -> None:
+        """Close this manager's HTTP clients."""
+        await self._clients.aclose()
 
     # ── Token management ───────────────────────────────────────────────
 
@@ -146,43 +348,59 @@ class AntigravityAuthManager:
         creds = self.active_credentials
         if not creds:
             raise RuntimeError("Not authenticated. Run 'nanobot auth login' first.")
-        if creds.is_expired:
-            await self._refresh()
+        if time.monotonic() < self._valid_until:
+            return creds.access_token
+        if not creds.is_expired:
+            self._remember_expiry(creds)
+            return creds.access_token
+        # Created lazily so the manager can be built outside an event loop.
+        if self._refresh_lock is None:
+            self._refresh_lock = asyncio.Lock()
+        async with self._refresh_lock:
+            # Another caller may have refreshed while we waited for the lock.
+            if creds.is_expired:
+                await self._refresh()
+        self._remember_expiry(creds)
         return creds.access_token
 
+    def _remember_expiry(self, creds: AntigravityCredentials) -> None:
+        """Cache the token deadline (with the 5-minute buffer) on the monotonic clock."""
+        self._valid_until = time.monotonic() + (creds.expires_at - 300 - time.time())
+
     async def _refresh(self) -> None:
         """Refresh the access token using refresh_token."""
         creds = self.active_credentials
         if not creds or not creds.refresh_token:
             raise RuntimeError("No refresh token. Run 'nanobot auth login' again.")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                TOKEN_URL,
-                data={
-                    "client_id": CLIENT_ID,
-                    "client_secret": CLIENT_SECRET,
-                    "refresh_token": creds.refresh_token,
-                    "grant_type": "refresh_token",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
+        response = await self._get_client().post(
+            TOKEN_URL,
+            data={
+                "client_id": CLIENT_ID,
+                "client_secret": CLIENT_SECRET,
+                "refresh_token": creds.refresh_token,
+                "grant_type": "refresh_token",
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
 
         creds.access_token = data["access_token"]
         creds.expires_at = time.time() + data.get("expires_in", 3600)
         if "refresh_token" in data:
             creds.refresh_token = data["refresh_token"]
-        self._save()
+        self._mark_dirty(token_changed=True)
 
     # ── Account management ─────────────────────────────────────────────
 
     def switch(self, email: str) -> bool:
         """Switch the active account. Returns True if successful."""
+        self._ensure_loaded()
         if email not in self._accounts:
             return False
         self._active_email = email
-        self._save()
+        self._valid_until = 0.0
+        self._mark_dirty()
         return True
 
     # ── OAuth PKCE login flow ──────────────────────────────────────────
@@ -193,84 +411,32 @@ class AntigravityAuthManager:
         This is a synchronous/blocking method suitable for CLI usage.
         The new account is added (or replaced if same email) and set as active.
         """
+        self._ensure_loaded()
         # PKCE verifier + challenge
         code_verifier = secrets.token_urlsafe(64)
-        challenge_bytes = hashlib.sha256(code_verifier.encode()).digest()
-        code_challenge = base64.urlsafe_b64encode(challenge_bytes).rstrip(b"=").decode()
+        digest = hashlib.sha256(code_verifier.encode("ascii")).digest()
+        # A 32-byte digest encodes to 44 chars ending in a single "=" pad.
+        code_challenge = base64.urlsafe_b64encode(digest)[:43].decode("ascii")
 
         # State for CSRF protection
         state = secrets.token_urlsafe(32)
 
-        params = {
-            "client_id": CLIENT_ID,
-            "redirect_uri": OAUTH_REDIRECT_URI,
-            "response_type": "code",
-            "scope": " ".join(SCOPES),
-            "state": state,
-            "code_challenge": code_challenge,
-            "code_challenge_method": "S256",
-            "access_type": "offline",
-            "prompt": "consent",
-        }
-        auth_url = f"{AUTH_URL}?{urlencode(params)}"
+        dynamic = urlencode({"state": state, "code_challenge": code_challenge})
+        auth_url = f"{AUTH_URL}?{STATIC_AUTH_QUERY}&{dynamic}"
 
         # ── Local callback server ──────────────────────────────────────
-        auth_code: str | None = None
-        error: str | None = None
-
-        class _Handler(BaseHTTPRequestHandler):
-            def do_GET(self):  # noqa: N802
-                nonlocal auth_code, error
-                query = parse_qs(urlparse(self.path).query)
-
-                if "error" in query:
-                    error = query["error"][0]
-                    self.send_response(200)
-                    self.send_header("Content-Type", "text/html")
-                    self.end_headers()
-                    self.wfile.write(
-                        b"<h1>Authentication failed</h1><p>You can close this tab.</p>"
-                    )
-                    return
-
-                received_state = query.get("state", [None])[0]
-                if received_state != state:
-                    error = "State mismatch"
-                    self.send_response(400)
-                    self.end_headers()
-                    return
-
-                auth_code = query.get("code", [None])[0]
-                self.send_response(200)
-                self.send_header("Content-Type", "text/html")
-                self.end_headers()
-                self.wfile.write(
-                    b"<h1>Authentication successful!</h1>"
-                    b"<p>You can close this tab and return to the terminal.</p>"
-                )
-
-            def log_message(self, format, *args):  # noqa: A002
-                pass  # suppress HTTP server logs
-
-        server = HTTPServer(("localhost", OAUTH_REDIRECT_PORT), _Handler)
-        server.timeout = 120  # 2-minute timeout
-
-        webbrowser.open(auth_url)
-
-        while auth_code is None and error is None:
-            server.handle_request()
-        server.server_close()
+        with socket.create_server(("localhost", OAUTH_REDIRECT_PORT)) as server:
+            server.setblocking(False)
+            webbrowser.open(auth_url)
+            auth_code, error = _wait_for_callback(server, state)
 
         if error:
             raise RuntimeError(f"OAuth error: {error}")
         if not auth_code:
             raise RuntimeError("No authorization code received")
 
-        # Exchange code for tokens
-        token_data = self._exchange_code(auth_code, code_verifier)
-
-        # Fetch user email
-        email = self._get_user_email(token_data["access_token"])
+        # Exchange code for tokens and fetch the user email in one event loop
+        token_data, email = asyncio.run(self._finish_login(auth_code, code_verifier))
 
         creds = AntigravityCredentials(
             access_token=token_data["access_token"],
@@ -282,38 +448,53 @@ class AntigravityAuthManager:
         # Add/replace and set as active
         self._accounts[email] = creds
         self._active_email = email
+        self._remember_expiry(creds)
         self._save()
         return creds
 
-    # ── Helpers (synchronous, used during login) ───────────────────────
+    # ── Helpers (used during login) ────────────────────────────────────
 
-    def _exchange_code(self, code: str, code_verifier: str) -> dict[str, Any]:
+    async def _finish_login(self, code: str, code_verifier: str) -> tuple[dict[str, Any], str]:
+        """Exchange the code and resolve the account email over one client.
+
+        The client is closed afterwards because it is bound to this
+        short-lived event loop.
+        """
+        try:
+            token_data = await self._exchange_code(code, code_verifier)
+            # The id_token usually carries the email already; skip the extra round-trip.
+            email = _id_token_email(token_data.get("id_token", ""))
+            if not email:
+                email = await self._get_user_email(token_data["access_token"])
+            return token_data, email
+        finally:
+            await self.close()
+
+    async def _exchange_code(self, code: str, code_verifier: str) -> dict[str, Any]:
         """Exchange authorization code for tokens."""
-        with httpx.Client() as client:
-            response = client.post(
-                TOKEN_URL,
-                data={
-                    "client_id": CLIENT_ID,
-                    "client_secret": CLIENT_SECRET,
-                    "code": code,
-                    "code_verifier": code_verifier,
-                    "grant_type": "authorization_code",
-                    "redirect_uri": OAUTH_REDIRECT_URI,
-                },
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await self._get_client().post(
+            TOKEN_URL,
+            data={
+                "client_id": CLIENT_ID,
+                "client_secret": CLIENT_SECRET,
+                "code": code,
+                "code_verifier": code_verifier,
+                "grant_type": "authorization_code",
+                "redirect_uri": OAUTH_REDIRECT_URI,
+            },
+        )
+        response.raise_for_status()
+        return response.json()
 
-    def _get_user_email(self, access_token: str) -> str:
+    async def _get_user_email(self, access_token: str) -> str:
         """Fetch user email from Google userinfo endpoint."""
         try:
-            with httpx.Client() as client:
-                response = client.get(
-                    USERINFO_URL,
-                    headers={"Authorization": f"Bearer {access_token}"},
-                )
-                response.raise_for_status()
-                return response.json().get("email", "")
+            response = await self._get_client().get(
+                USERINFO_URL,
+                headers={"Authorization": f"Bearer {access_token}"},
+            )
+            response.raise_for_status()
+            return response.json().get("email", "")
         except Exception:
             return ""
 
@@ -324,6 +505,7 @@ class AntigravityAuthManager:
             email: Specific account to remove. If None, removes the active account.
                    Pass ``"*"`` to remove all accounts.
         """
+        self._ensure_loaded()
         if email == "*":
             # Remove all
             self._accounts.clear()
@@ -340,7 +522,16 @@ class AntigravityAuthManager:
                 self._accounts.pop(self._active_email, None)
                 self._active_email = next(iter(self._accounts), "")
 
+        self._valid_until = 0.0
         if self._accounts:
-            self._save()
-        elif self._creds_file.exists():
-            self._creds_file.unlink()
+            self._mark_dirty()
+        else:
+            self._dirty = False
+            if self._creds_file.exists():
+                self._creds_file.unlink()
+
+    def logout_many(self, emails: Iterable[str]) -> None:
+        """Remove several accounts, writing the credentials file once."""
+        with self.batch():
+            for email in emails:
+                self.logout(email)
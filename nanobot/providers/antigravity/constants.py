@@ -2,6 +2,8 @@
 
 import platform
 import random
+from pathlib import Path
+from urllib.parse import urlencode
 
 # OAuth Client Credentials (from Antigravity desktop client, public)
 CLIENT_ID = "1071006060591-tmhssin2h21lcre235vtolojh4g403ep.apps.googleusercontent.com"
@@ -38,10 +40,25 @@ GENERATE_CONTENT_PATH = "/v1internal:generateContent"
 STREAM_GENERATE_CONTENT_PATH = "/v1internal:streamGenerateContent"
 LOAD_CODE_ASSIST_PATH = "/v1internal:loadCodeAssist"
 
+SCOPES_JOINED = " ".join(SCOPES)
+
 # OAuth Callback
 OAUTH_REDIRECT_PORT = 51121
 OAUTH_REDIRECT_URI = f"http://localhost:{OAUTH_REDIRECT_PORT}/oauth-callback"
 
+# Static part of the authorization URL query; login() appends state + challenge
+STATIC_AUTH_QUERY = urlencode(
+    {
+        "client_id": CLIENT_ID,
+        "redirect_uri": OAUTH_REDIRECT_URI,
+        "response_type": "code",
+        "scope": SCOPES_JOINED,
+        "code_challenge_method": "S256",
+        "access_type": "offline",
+        "prompt": "consent",
+    }
+)
+
 # Antigravity version to impersonate
 ANTIGRAVITY_VERSION = "1.15.8"
 
@@ -55,11 +72,14 @@ _ANTIGRAVITY_API_CLIENTS = (
 
 _PLATFORM_TAG = "MACOS" if platform.system() == "Darwin" else "WINDOWS"
 
+_PREBUILT_USER_AGENTS = tuple(
+    f"antigravity/{ANTIGRAVITY_VERSION} {plat}" for plat in _ANTIGRAVITY_PLATFORMS
+)
+
 
 def get_randomized_user_agent() -> str:
     """Short-format User-Agent matching Antigravity Manager behaviour."""
-    plat = random.choice(_ANTIGRAVITY_PLATFORMS)  # noqa: S311
-    return f"antigravity/{ANTIGRAVITY_VERSION} {plat}"
+    return random.choice(_PREBUILT_USER_AGENTS)  # noqa: S311
 
 
 # DEFAULT_HEADERS — full header set used for loadCodeAssist (discovery) only.
@@ -86,9 +106,7 @@ def get_content_request_headers() -> dict[str, str]:
     > AM only sends User-Agent on content requests —
     > no X-Goog-Api-Client, no Client-Metadata header.
     """
-    return {
-        "User-Agent": get_randomized_user_agent(),
-    }
+    return {"User-Agent": random.choice(_PREBUILT_USER_AGENTS)}  # noqa: S311
 
 
 # Available Models (antigravity-prefixed models use Antigravity endpoints)
@@ -122,6 +140,12 @@ DEFAULT_PROJECT_ID = "rising-fact-p41fc"
 # Credential storage
 CREDENTIALS_DIR = ".nanobot/antigravity"
 CREDENTIALS_FILE = "credentials.json"
+# Resolved once at import so each manager construction skips the $HOME lookup
+CREDENTIALS_PATH = Path.home() / CREDENTIALS_DIR / CREDENTIALS_FILE
+
+# Discovered project IDs, keyed by account email, reused across processes
+PROJECT_CACHE_PATH = CREDENTIALS_PATH.with_name("projects.json")
+PROJECT_CACHE_TTL = 24 * 3600  # seconds
 
 # Retry / resilience
 RETRYABLE_STATUS_CODES = frozenset({429, 500, 503})
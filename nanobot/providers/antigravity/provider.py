@@ -3,13 +3,22 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
+import os
 import random
+import re
+import secrets
+import time
 import uuid
-from typing import Any
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, ClassVar
 
 import httpx
 
+from nanobot.providers.antigravity._http import LoopClients
 from nanobot.providers.antigravity.auth import AntigravityAuthManager
 from nanobot.providers.antigravity.constants import (
     API_ENDPOINT_FALLBACKS,
@@ -22,6 +31,8 @@ from nanobot.providers.antigravity.constants import (
     LOAD_CODE_ASSIST_PATH,
     MAX_RETRIES,
     MODEL_ALIASES,
+    PROJECT_CACHE_PATH,
+    PROJECT_CACHE_TTL,
     RETRY_BASE_DELAY,
     RETRYABLE_STATUS_CODES,
     STREAM_GENERATE_CONTENT_PATH,
@@ -34,9 +45,92 @@ from nanobot.providers.antigravity.transform import (
     tools_to_gemini,
 )
 from nanobot.providers.base import LLMProvider, LLMResponse, LLMStreamChunk
+from nanobot.utils import fastjson
 
 logger = logging.getLogger(__name__)
 
+# All traffic goes to a handful of Google hosts, so one HTTP/2 connection per
+# host multiplexes concurrent chat/stream calls without extra handshakes.
+_CLIENT_TIMEOUT = httpx.Timeout(300.0, connect=10.0)
+_CLIENT_LIMITS = httpx.Limits(
+    max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0
+)
+
+def _read_project_cache() -> dict[str, Any]:
+    try:
+        data = fastjson.loads(PROJECT_CACHE_PATH.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _cached_project_id(email: str) -> str | None:
+    """Project ID persisted for *email* by an earlier process, if still fresh."""
+    entry = _read_project_cache().get(email)
+    if isinstance(entry, dict) and time.time() - entry.get("ts", 0) < PROJECT_CACHE_TTL:
+        return entry.get("project") or None
+    return None
+
+
+def _write_project_cache(email: str, project: str | None) -> None:
+    """Store (or with ``project=None`` drop) the persisted project for *email*."""
+    data = _read_project_cache()
+    if project is None:
+        if data.pop(email, None) is None:
+            return
+    else:
+        data[email] = {"project": project, "ts": time.time()}
+    tmp = PROJECT_CACHE_PATH.with_name(PROJECT_CACHE_PATH.name + ".tmp")
+    try:
+        PROJECT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_bytes(fastjson.dumps(data))
+        os.replace(tmp, PROJECT_CACHE_PATH)
+    except OSError:
+        logger.debug("Could not write project cache", exc_info=True)
+
+
+def _fast_request_id() -> str:
+    """Unique per-request id; hex from token_hex skips building a UUID object."""
+    return f"agent-{secrets.token_hex(16)}"
+
+
+# All adjective-noun pairs for synthetic project IDs (reference format)
+_SYNTHETIC_PROJECT_PREFIXES = tuple(
+    f"{adj}-{noun}"
+    for adj in ("useful", "bright", "swift", "calm", "bold")
+    for noun in ("fuze", "wave", "spark", "flow", "core")
+)
+
+_LOAD_CODE_ASSIST_BODY = fastjson.dumps(
+    {"metadata": {"ideType": "ANTIGRAVITY", "platform": 2, "pluginType": "GEMINI"}}
+)
+
+# SSE events larger than this are parsed in a worker thread
+_OFFLOAD_PARSE_BYTES = 4096
+
+# Static fields of the v1internal request envelope
+_ENVELOPE = {"requestType": "agent", "userAgent": "antigravity"}
+_TIER_SUFFIXES = frozenset({"minimal", "low", "medium", "high"})
+
+
+async def _sse_data(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yield the payload of each ``data:`` line from a raw SSE byte stream.
+
+    Splits on ``\n`` in a byte buffer so only the payloads are ever sliced
+    out; nothing is decoded to ``str``.
+    """
+    buf = bytearray()
+    async for chunk in chunks:
+        buf += chunk
+        start = 0
+        while (end := buf.find(b"\n", start)) != -1:
+            if buf.startswith(b"data: ", start, end):
+                yield bytes(buf[start + 6 : end]).rstrip(b"\r")
+            start = end + 1
+        del buf[:start]
+    if buf.startswith(b"data: "):
+        yield bytes(buf[6:]).rstrip(b"\r")
+
 
 class AntigravityProvider(LLMProvider):
     """LLM provider using Google Antigravity OAuth for model access.
@@ -46,12 +140,16 @@ class AntigravityProvider(LLMProvider):
     endpoint failover (daily ↔ prod).
     """
 
+    # Discovered project per account email, shared by every provider instance
+    _PROJECT_ID_CACHE: ClassVar[dict[str, str]] = {}
+
     def __init__(
         self,
         auth_manager: AntigravityAuthManager | None = None,
         endpoint: str | None = None,
         default_model: str = DEFAULT_MODEL,
         project_id: str | None = None,
+        prewarm_fallbacks: bool = False,
     ):
         super().__init__(
             api_key=None,
@@ -59,10 +157,31 @@ class AntigravityProvider(LLMProvider):
         )
         self._auth = auth_manager or AntigravityAuthManager()
         self._endpoint = endpoint or DEFAULT_API_ENDPOINT
+        if self._endpoint in API_ENDPOINT_FALLBACKS:
+            # Known endpoint — put it first, then the rest in order
+            rest = (ep for ep in API_ENDPOINT_FALLBACKS if ep != self._endpoint)
+            self._endpoint_order: tuple[str, ...] = (self._endpoint, *rest)
+        else:
+            # Custom endpoint — no fallback
+            self._endpoint_order = (self._endpoint,)
+        self._generate_urls = tuple(f"{ep}{GENERATE_CONTENT_PATH}" for ep in self._endpoint_order)
         self._default_model = default_model
         self._provided_project_id = project_id
-        self._project_id_cache: dict[str, str] = {}
-        self._client: httpx.AsyncClient | None = None
+        # Open the next endpoint's connection while sleeping before a retry
+        self._prewarm = prewarm_fallbacks
+        self._background: set[asyncio.Task] = set()
+        self._project_id_lock: asyncio.Lock | None = None
+        # Picked once per provider, so the User-Agent stays stable for its lifetime
+        self._base_headers = get_content_request_headers() | {
+            "Content-Type": "application/json"
+        }
+        # (token, headers) — rebuilt only when the access token changes
+        self._auth_headers: tuple[str, dict[str, str]] | None = None
+        # One client per event loop: pooled connections are bound to the loop
+        # that opened them.
+        self._clients = LoopClients(
+            lambda: httpx.AsyncClient(timeout=_CLIENT_TIMEOUT, http2=True, limits=_CLIENT_LIMITS)
+        )
 
     # ── Stable session ID ───────────────────────────────────────────────
 
@@ -78,14 +197,18 @@ class AntigravityProvider(LLMProvider):
     # ── HTTP client ────────────────────────────────────────────────────
 
     async def _get_client(self) -> httpx.AsyncClient:
-        if self._client is None or self._client.is_closed:
-            self._client = httpx.AsyncClient(timeout=300.0)
-        return self._client
+        return self._clients.get()
 
     async def close(self) -> None:
-        """Close the HTTP client."""
-        if self._client and not self._client.is_closed:
-            await self._client.aclose()
+        """Close the HTTP clients (content requests and token refresh)."""
+        await self._clients.aclose()
+        await self._auth.close()
+
+    async def __aenter__(self) -> AntigravityProvider:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
 
     # ── Project discovery ──────────────────────────────────────────────
 
@@ -102,71 +225,124 @@ class AntigravityProvider(LLMProvider):
         token = await self._auth.get_valid_token()
         email = self._auth.email
 
-        if email in self._project_id_cache:
-            return self._project_id_cache[email]
-
+        if email in self._PROJECT_ID_CACHE:
+            return self._PROJECT_ID_CACHE[email]
+
+        # Concurrent first calls (e.g. a fan-out of chat()s) share one discovery.
+        if self._project_id_lock is None:
+            self._project_id_lock = asyncio.Lock()
+        async with self._project_id_lock:
+            if email not in self._PROJECT_ID_CACHE:
+                project = _cached_project_id(email)
+                if project is None:
+                    project = await self._discover_project_id(token, email)
+                    if project:
+                        _write_project_cache(email, project)
+                    else:
+                        logger.warning(
+                            "Could not discover project via loadCodeAssist, using default: %s",
+                            DEFAULT_PROJECT_ID,
+                        )
+                        project = DEFAULT_PROJECT_ID
+                self._PROJECT_ID_CACHE[email] = project
+        return self._PROJECT_ID_CACHE[email]
+
+    @classmethod
+    def invalidate_project(cls, email: str) -> None:
+        """Forget the project for *email* so the next call rediscovers it."""
+        cls._PROJECT_ID_CACHE.pop(email, None)
+        _write_project_cache(email, None)
+
+    async def _discover_project_id(self, token: str, email: str) -> str | None:
+        """Ask loadCodeAssist for the account's project; None if no endpoint knows it.
+
+        All endpoints are probed at once and the first one to answer with a
+        project wins, so a slow or unreachable endpoint costs nothing when
+        another responds.
+        """
         client = await self._get_client()
-        body = {
-            "metadata": {
-                "ideType": "ANTIGRAVITY",
-                "platform": 2,
-                "pluginType": "GEMINI",
-            }
+        headers = {**DEFAULT_HEADERS, "Authorization": f"Bearer {token}"}
+        pending = {
+            asyncio.create_task(self._load_code_assist(client, ep, headers))
+            for ep in API_ENDPOINT_FALLBACKS
         }
-
-        # Try endpoints in order (prod first for loadCodeAssist per reference)
-        endpoints = [API_ENDPOINT_FALLBACKS[-1], *API_ENDPOINT_FALLBACKS[:-1]]
-        for ep in endpoints:
-            url = f"{ep}{LOAD_CODE_ASSIST_PATH}"
-            try:
-                resp = await client.post(
-                    url,
-                    json=body,
-                    headers={
-                        **DEFAULT_HEADERS,
-                        "Authorization": f"Bearer {token}",
-                    },
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    project = data.get("cloudaicompanionProject", "")
-                    if project:
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if project := task.result():
                         logger.info("Discovered project for %s: %s", email, project)
-                        self._project_id_cache[email] = project
                         return project
-            except Exception:
-                logger.debug("loadCodeAssist failed on %s", ep, exc_info=True)
+        finally:
+            for task in pending:
+                task.cancel()
+        return None
 
-        # Fallback
-        logger.warning(
-            "Could not discover project via loadCodeAssist, using default: %s",
-            DEFAULT_PROJECT_ID,
-        )
-        self._project_id_cache[email] = DEFAULT_PROJECT_ID
-        return DEFAULT_PROJECT_ID
+    @staticmethod
+    async def _load_code_assist(
+        client: httpx.AsyncClient, endpoint: str, headers: dict[str, str]
+    ) -> str | None:
+        """Return ``cloudaicompanionProject`` from one endpoint, or None."""
+        try:
+            resp = await client.post(
+                f"{endpoint}{LOAD_CODE_ASSIST_PATH}",
+                content=_LOAD_CODE_ASSIST_BODY,
+                headers=headers,
+            )
+            if resp.status_code == 200:
+                return fastjson.loads(resp.content).get("cloudaicompanionProject") or None
+        except Exception:
+            logger.debug("loadCodeAssist failed on %s", endpoint, exc_info=True)
+        return None
 
     # ── Retry / resilience ─────────────────────────────────────────────
 
-    def _get_endpoints(self) -> list[str]:
-        """Return ordered list of endpoints to try (primary + fallbacks)."""
-        if self._endpoint in API_ENDPOINT_FALLBACKS:
-            # Known endpoint — put it first, then the rest in order
-            rest = [ep for ep in API_ENDPOINT_FALLBACKS if ep != self._endpoint]
-            return [self._endpoint, *rest]
-        else:
-            # Custom endpoint — no fallback
-            return [self._endpoint]
+    def _warm_connection(self, client: httpx.AsyncClient, endpoint: str) -> None:
+        """Open a pooled connection to *endpoint* in the background."""
+
+        async def _warm() -> None:
+            try:
+                await client.head(endpoint, timeout=5.0)
+            except Exception:
+                logger.debug("Prewarm of %s failed", endpoint, exc_info=True)
+
+        task = asyncio.create_task(_warm())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _headers_for(self, token: str) -> dict[str, str]:
+        """Content-request headers stamped with *token*, reused until it changes."""
+        cached = self._auth_headers
+        if cached is None or cached[0] != token:
+            cached = (token, self._base_headers | {"Authorization": f"Bearer {token}"})
+            self._auth_headers = cached
+        return cached[1]
+
+    def _get_endpoints(self) -> tuple[str, ...]:
+        """Return ordered endpoints to try (primary + fallbacks)."""
+        return self._endpoint_order
 
     @staticmethod
     def _get_retry_delay(response: httpx.Response, attempt: int) -> float:
-        """Calculate retry delay: respect Retry-After header or use exponential backoff."""
+        """Calculate retry delay: respect Retry-After header or use exponential backoff.
+
+        Both are jittered so that clients throttled together do not retry in
+        lockstep: ±5% around Retry-After, full jitter for the backoff.
+        Retry-After may be delay-seconds or an HTTP-date (RFC 7231).
+        """
         retry_after = response.headers.get("Retry-After")
         if retry_after:
             try:
-                return min(float(retry_after), 60.0)
+                delay = float(retry_after)
             except ValueError:
-                pass
-        return RETRY_BASE_DELAY * (2**attempt)
+                try:
+                    target = parsedate_to_datetime(retry_after)
+                    delay = (target - datetime.now(tz=timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(delay, 0.0) * random.uniform(0.95, 1.05), 60.0)  # noqa: S311
+        return random.uniform(0, min(RETRY_BASE_DELAY * (2**attempt), 60.0))  # noqa: S311
 
     async def _request_with_retry(
         self,
@@ -181,29 +357,30 @@ class AntigravityProvider(LLMProvider):
         - On non-retryable HTTP error: raise immediately
         """
         client = await self._get_client()
-        headers = {
-            **get_content_request_headers(),
-            "Authorization": f"Bearer {token}",
-        }
-        endpoints = self._get_endpoints()
+        headers = self._headers_for(token)
+        # Encoded once and resent as-is on every retry / fallback attempt
+        content = fastjson.dumps(body)
         last_error: Exception | None = None
+        # The request log builds a truncated header copy; skip it unless shown.
+        debug = logger.isEnabledFor(logging.DEBUG)
 
-        for endpoint in endpoints:
-            url = f"{endpoint}{GENERATE_CONTENT_PATH}"
+        for index, (endpoint, url) in enumerate(zip(self._endpoint_order, self._generate_urls)):
+            fallback = self._endpoint_order[index + 1] if index + 1 < len(self._endpoint_order) else None
 
             for attempt in range(MAX_RETRIES):
                 try:
-                    logger.debug(
-                        "Antigravity request: url=%s headers=%s body_keys=%s model=%s project=%s",
-                        url,
-                        {k: v[:50] if isinstance(v, str) else v for k, v in headers.items()},
-                        list(body.keys()) if isinstance(body, dict) else "?",
-                        body.get("model") if isinstance(body, dict) else "?",
-                        body.get("project") if isinstance(body, dict) else "?",
-                    )
+                    if debug:
+                        logger.debug(
+                            "Antigravity request: url=%s headers=%s body_keys=%s model=%s project=%s",
+                            url,
+                            {k: v[:50] if isinstance(v, str) else v for k, v in headers.items()},
+                            list(body.keys()) if isinstance(body, dict) else "?",
+                            body.get("model") if isinstance(body, dict) else "?",
+                            body.get("project") if isinstance(body, dict) else "?",
+                        )
                     response = await client.post(
                         url,
-                        json=body,
+                        content=content,
                         headers=headers,
                     )
 
@@ -240,6 +417,10 @@ class AntigravityProvider(LLMProvider):
                             response.status_code,
                             endpoint,
                         )
+                        if self._prewarm and fallback:
+                            # Hide the fallback's TCP/TLS handshake under the backoff sleep
+                            self._warm_connection(client, fallback)
+                            fallback = None
                         await asyncio.sleep(delay)
                     else:
                         # Exhausted retries on this endpoint — try next
@@ -259,6 +440,13 @@ class AntigravityProvider(LLMProvider):
                     break  # Next endpoint
 
         # All endpoints exhausted
+        if (
+            isinstance(last_error, httpx.HTTPStatusError)
+            and last_error.response.status_code in FALLBACK_STATUS_CODES
+            and not self._provided_project_id
+        ):
+            # Every endpoint rejected the project — it may be stale; rediscover next time
+            self.invalidate_project(self._auth.email)
         if last_error:
             raise last_error
         raise RuntimeError("All Antigravity endpoints exhausted")
@@ -288,7 +476,7 @@ class AntigravityProvider(LLMProvider):
             )
 
             response = await self._request_with_retry(body, token)
-            data = response.json()
+            data = fastjson.loads(response.content)
 
             parsed = parse_gemini_response(data, model=model)
             return LLMResponse(
@@ -333,8 +521,6 @@ class AntigravityProvider(LLMProvider):
         Yields ``LLMStreamChunk`` objects as they arrive from the
         Antigravity streaming endpoint.
         """
-        import json as _json
-
         model = model or self._default_model
 
         token = await self._auth.get_valid_token()
@@ -350,26 +536,24 @@ class AntigravityProvider(LLMProvider):
 
         client = await self._get_client()
         url = f"{self._endpoint}{STREAM_GENERATE_CONTENT_PATH}?alt=sse"
-        headers = {
-            **get_content_request_headers(),
-            "Authorization": f"Bearer {token}",
-            "Accept": "text/event-stream",
-        }
+        headers = {**self._headers_for(token), "Accept": "text/event-stream"}
 
-        async with client.stream("POST", url, json=body, headers=headers) as resp:
+        async with client.stream(
+            "POST", url, content=fastjson.dumps(body), headers=headers
+        ) as resp:
             resp.raise_for_status()
-            async for line in resp.aiter_lines():
-                if not line.startswith("data: "):
-                    continue
-                payload = line[6:]  # strip "data: "
-                if payload.strip() == "[DONE]":
+            async for payload in _sse_data(resp.aiter_bytes()):
+                if payload.strip() == b"[DONE]":
                     break
                 try:
-                    event = _json.loads(payload)
-                except _json.JSONDecodeError:
+                    if len(payload) > _OFFLOAD_PARSE_BYTES:
+                        # Big events (tool-call JSON) would stall other coroutines
+                        parsed = await asyncio.to_thread(parse_sse_chunk, payload)
+                    else:
+                        parsed = parse_sse_chunk(payload)
+                except ValueError:
                     continue
 
-                parsed = parse_sse_chunk(event)
                 yield LLMStreamChunk(
                     content_delta=parsed["content_delta"],
                     tool_calls_delta=parsed["tool_calls_delta"],
@@ -391,8 +575,16 @@ class AntigravityProvider(LLMProvider):
         "groq/",
         "openrouter/",
     )
+    # One optional LiteLLM prefix followed by an optional ``antigravity-`` prefix
+    _PREFIX_RE = re.compile(
+        "^(?:(?:" + "|".join(re.escape(p) for p in _LITELLM_PREFIXES) + "))?(?:antigravity-)?",
+        re.IGNORECASE,
+    )
+    _PREVIEW_RE = re.compile("-preview$", re.IGNORECASE)
 
+    # Pure and called on every request with a handful of distinct names.
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def _resolve_model(model: str) -> str:
         """Resolve user-facing model name to Antigravity API model name.
 
@@ -406,30 +598,19 @@ class AntigravityProvider(LLMProvider):
         Note: the ``antigravity-`` prefix is a registry/routing convention;
         the actual API expects bare names like ``claude-sonnet-4-5``.
         """
-        resolved = model.strip()
-
         # Strip LiteLLM provider prefix (e.g. "anthropic/claude-opus-4-5" → "claude-opus-4-5")
-        for prefix in AntigravityProvider._LITELLM_PREFIXES:
-            if resolved.lower().startswith(prefix):
-                resolved = resolved[len(prefix) :]
-                break
-
-        # Strip antigravity- prefix (API body doesn't use it)
-        if resolved.lower().startswith("antigravity-"):
-            resolved = resolved[len("antigravity-") :]
+        # and the antigravity- prefix (API body doesn't use it)
+        resolved = AntigravityProvider._PREFIX_RE.sub("", model.strip(), count=1)
 
         # Strip -preview
-        if resolved.lower().endswith("-preview"):
-            resolved = resolved[: -len("-preview")]
+        resolved = AntigravityProvider._PREVIEW_RE.sub("", resolved, count=1)
 
         # Apply aliases (e.g. claude-opus-4-5 → claude-opus-4-6-thinking)
         resolved = MODEL_ALIASES.get(resolved, resolved)
 
         # Gemini 3 Pro auto-tier: if no tier suffix, default to -low
-        tier_suffixes = ("-minimal", "-low", "-medium", "-high")
-        if resolved.lower().startswith("gemini-3-pro") and not resolved.lower().endswith(
-            tier_suffixes
-        ):
+        lower = resolved.lower()
+        if lower.startswith("gemini-3-pro") and lower.rpartition("-")[2] not in _TIER_SUFFIXES:
             resolved = f"{resolved}-low"
 
         return resolved
@@ -439,12 +620,8 @@ class AntigravityProvider(LLMProvider):
     @staticmethod
     def _generate_synthetic_project_id() -> str:
         """Generate a random synthetic project ID matching reference format."""
-        adjectives = ("useful", "bright", "swift", "calm", "bold")
-        nouns = ("fuze", "wave", "spark", "flow", "core")
-        adj = random.choice(adjectives)  # noqa: S311
-        noun = random.choice(nouns)  # noqa: S311
-        suffix = uuid.uuid4().hex[:5]
-        return f"{adj}-{noun}-{suffix}"
+        prefix = random.choice(_SYNTHETIC_PROJECT_PREFIXES)  # noqa: S311
+        return f"{prefix}-{uuid.uuid4().hex[:5]}"
 
     # ── Request building ───────────────────────────────────────────────
 
@@ -511,12 +688,12 @@ class AntigravityProvider(LLMProvider):
             "project": project_id,
             "model": api_model,
             "request": request_payload,
-            "requestType": "agent",
-            "userAgent": "antigravity",
-            "requestId": f"agent-{uuid.uuid4()}",
+            **_ENVELOPE,
+            "requestId": _fast_request_id(),
         }
 
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def _is_thinking_model(model: str) -> bool:
         """Check if model requires thinking configuration."""
         return model.lower().endswith("-thinking")
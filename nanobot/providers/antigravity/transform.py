@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
-import json
-import uuid
+import copy
+import functools
+import itertools
+import secrets
 from typing import Any
 
 from nanobot.providers.antigravity.constants import (
@@ -11,6 +13,32 @@ from nanobot.providers.antigravity.constants import (
     REJECTED_SCHEMA_KEYS,
 )
 from nanobot.providers.base import ToolCallDelta, ToolCallRequest
+from nanobot.utils import fastjson
+
+# IDs only correlate calls with results inside one process, so a random
+# per-process prefix plus a counter is enough and avoids a urandom read each.
+_ID_PREFIX = secrets.token_hex(6)
+_ID_COUNTER = itertools.count()
+
+
+_FINISH_REASON_MAP: dict[str, str] = {
+    "STOP": "stop",
+    "MAX_TOKENS": "length",
+    "SAFETY": "content_filter",
+    "RECITATION": "content_filter",
+    "FINISH_REASON_UNSPECIFIED": "stop",
+}
+
+
+_STRIPPED_SCHEMA_KEYS = REJECTED_SCHEMA_KEYS | COMPOSITION_SCHEMA_KEYS
+
+# Tool-call arguments longer than this are parsed on every request instead of
+# being kept as cache keys; large payloads (file contents) rarely repeat.
+_ARGS_CACHE_MAX = 4096
+
+
+def _make_id(tag: str) -> str:
+    return f"{tag}_{_ID_PREFIX}{next(_ID_COUNTER):06x}"
 
 
 def messages_to_gemini(
@@ -21,95 +49,131 @@ def messages_to_gemini(
     Returns:
         (contents, system_instruction) — system_instruction is None if no
         system messages are present.
+
+    Parsed tool-call arguments are memoized and shared between requests:
+    the ``args`` of ``functionCall`` parts must be treated as read-only.
     """
-    system_parts: list[dict[str, Any]] = []
-    contents: list[dict[str, Any]] = []
+    system_texts: list[str] = []
+    merged: list[dict[str, Any]] = []
+    last_role: str | None = None
+    last_has_fr = False
+    parts: list[dict[str, Any]]
 
     for msg in messages:
         role = msg["role"]
         content = msg.get("content")
 
+        # ── Plain string turn (the common case) ────────────────────────
+        if (
+            type(content) is str
+            and content
+            and (role == "user" or (role == "assistant" and not msg.get("tool_calls")))
+        ):
+            gemini_role = "model" if role == "assistant" else "user"
+            parts = [{"text": content}]
+
         # ── System messages ────────────────────────────────────────────
-        if role == "system":
+        elif role == "system":
             if content:
-                system_parts.append({"text": content})
+                system_texts.append(content)
             continue
 
-        # ── Map role ───────────────────────────────────────────────────
-        gemini_role = "model" if role == "assistant" else "user"
-        parts: list[dict[str, Any]] = []
+        else:
+            # ── Map role ───────────────────────────────────────────────
+            gemini_role = "model" if role == "assistant" else "user"
+
+            # ── Assistant with tool calls ──────────────────────────────
+            if role == "assistant" and msg.get("tool_calls"):
+                parts = [{"text": content}] if content else []
+                for tc in msg["tool_calls"]:
+                    args = tc["function"]["arguments"]
+                    if isinstance(args, str):
+                        args = _parse_arguments(args)
+                    tc_id = tc["id"] if "id" in tc else _make_id("tc")
+                    parts.append(
+                        {
+                            "functionCall": {
+                                "id": tc_id,
+                                "name": tc["function"]["name"],
+                                "args": args,
+                            }
+                        }
+                    )
 
-        # ── Assistant with tool calls ──────────────────────────────────
-        if role == "assistant" and msg.get("tool_calls"):
-            if content:
-                parts.append({"text": content})
-            for tc in msg["tool_calls"]:
-                args = tc["function"]["arguments"]
-                if isinstance(args, str):
-                    try:
-                        args = json.loads(args)
-                    except json.JSONDecodeError:
-                        args = {"raw": args}
-                tc_id = tc.get("id", f"tc_{uuid.uuid4().hex[:12]}")
-                parts.append(
+            # ── Tool result ────────────────────────────────────────────
+            elif role == "tool":
+                name = msg.get("name", msg.get("tool_call_id", ""))
+                tc_id = msg["tool_call_id"] if "tool_call_id" in msg else _make_id("tc")
+                parts = [
                     {
-                        "functionCall": {
+                        "functionResponse": {
                             "id": tc_id,
-                            "name": tc["function"]["name"],
-                            "args": args,
+                            "name": name,
+                            "response": {"result": content or ""},
                         }
                     }
-                )
+                ]
 
-        # ── Tool result ────────────────────────────────────────────────
-        elif role == "tool":
-            name = msg.get("name", msg.get("tool_call_id", ""))
-            tc_id = msg.get("tool_call_id", f"tc_{uuid.uuid4().hex[:12]}")
-            parts.append(
-                {
-                    "functionResponse": {
-                        "id": tc_id,
-                        "name": name,
-                        "response": {"result": content or ""},
-                    }
-                }
-            )
-
-        # ── Regular content (string or multimodal list) ────────────────
-        elif content:
-            if isinstance(content, list):
+            # ── Regular content (string or multimodal list) ────────────
+            elif not content:
+                continue
+            elif isinstance(content, list):
+                parts = []
                 for item in content:
                     if isinstance(item, dict) and item.get("type") == "text":
                         parts.append({"text": item["text"]})
                     elif isinstance(item, str):
                         parts.append({"text": item})
+                if not parts:
+                    continue
             else:
-                parts.append({"text": content})
+                parts = [{"text": content}]
+
+        # ── Merge consecutive same-role messages ───────────────────────
+        # Gemini rejects two consecutive messages with the same role.
+        # IMPORTANT: functionResponse parts must NOT be merged with text
+        # parts in the same user turn — Claude models reject mixed content.
+        # Only tool results produce functionResponse parts.
+        has_fr = role == "tool"
+        if gemini_role == last_role:
+            if has_fr == last_has_fr:
+                merged[-1]["parts"].extend(parts)
+                continue
+            # Different part types — insert model placeholder to maintain
+            # role alternation without mixing function and text parts.
+            merged.append({"role": "model", "parts": [{"text": "OK."}]})
+        merged.append({"role": gemini_role, "parts": parts})
+        last_role = gemini_role
+        last_has_fr = has_fr
+
+    # One joined part serializes smaller than one part per system message.
+    system_instruction = (
+        {"role": "user", "parts": [{"text": "\n\n".join(system_texts)}]} if system_texts else None
+    )
+    return merged, system_instruction
 
-        if parts:
-            contents.append({"role": gemini_role, "parts": parts})
 
-    # ── Merge consecutive same-role messages ───────────────────────────
-    # Gemini rejects two consecutive messages with the same role.
-    # IMPORTANT: functionResponse parts must NOT be merged with text
-    # parts in the same user turn — Claude models reject mixed content.
-    merged: list[dict[str, Any]] = []
-    for entry in contents:
-        if merged and merged[-1]["role"] == entry["role"]:
-            prev_has_fr = any("functionResponse" in p for p in merged[-1]["parts"])
-            curr_has_fr = any("functionResponse" in p for p in entry["parts"])
-            if prev_has_fr != curr_has_fr:
-                # Different part types — insert model placeholder to maintain
-                # role alternation without mixing function and text parts.
-                merged.append({"role": "model", "parts": [{"text": "OK."}]})
-                merged.append(entry)
-            else:
-                merged[-1]["parts"].extend(entry["parts"])
-        else:
-            merged.append(entry)
+def _parse_arguments(args: str) -> Any:
+    """Decode tool-call arguments, memoizing strings up to ``_ARGS_CACHE_MAX``.
+
+    The whole history is re-sent every turn, so earlier calls hit the cache.
+    Cached results are shared between requests and must not be mutated.
+    """
+    if len(args) <= _ARGS_CACHE_MAX:
+        return _parse_arguments_cached(args)
+    return _decode_arguments(args)
 
-    system_instruction = {"role": "user", "parts": system_parts} if system_parts else None
-    return merged, system_instruction
+
+@functools.lru_cache(maxsize=512)
+def _parse_arguments_cached(args: str) -> Any:
+    return _decode_arguments(args)
+
+
+def _decode_arguments(args: str) -> Any:
+    try:
+        return fastjson.loads(args)
+    except ValueError:
+        return {"raw": args}
 
 
 def tools_to_gemini(
@@ -119,10 +183,25 @@ def tools_to_gemini(
 
     OpenAI:  [{"type": "function", "function": {"name": ..., ...}}]
     Gemini:  [{"functionDeclarations": [{"name": ..., ...}]}]
+
+    The tool list rarely changes between requests, so results are memoized on
+    its JSON encoding and shared: callers must not mutate them.
     """
     if not tools:
         return None
+    try:
+        encoded = fastjson.dumps(tools)
+    except (TypeError, ValueError):
+        return _convert_tools(tools)
+    return _convert_tools_encoded(encoded)
+
+
+@functools.lru_cache(maxsize=64)
+def _convert_tools_encoded(encoded: bytes) -> list[dict[str, Any]] | None:
+    return _convert_tools(fastjson.loads(encoded))
+
 
+def _convert_tools(tools: list[dict[str, Any]]) -> list[dict[str, Any]] | None:
     declarations: list[dict[str, Any]] = []
     for tool in tools:
         if tool.get("type") != "function":
@@ -133,7 +212,7 @@ def tools_to_gemini(
             "description": func.get("description", ""),
         }
         if "parameters" in func:
-            decl["parameters"] = sanitize_schema(func["parameters"])
+            decl["parameters"] = _sanitize_cached(func["parameters"])
         declarations.append(decl)
 
     if not declarations:
@@ -142,8 +221,26 @@ def tools_to_gemini(
     return [{"functionDeclarations": declarations}]
 
 
-def sanitize_schema(schema: Any) -> Any:
-    """Recursively strip JSON Schema keys rejected by Gemini API.
+def _sanitize_cached(schema: Any) -> Any:
+    """``sanitize_schema`` memoized on the schema's JSON encoding.
+
+    Tool definitions are rebuilt as fresh dicts on every request, so identity
+    cannot be the key; encoding is far cheaper than the recursive sanitize.
+    """
+    try:
+        encoded = fastjson.dumps(schema)
+    except (TypeError, ValueError):
+        return sanitize_schema(schema)
+    return _sanitize_encoded(encoded)
+
+
+@functools.lru_cache(maxsize=256)
+def _sanitize_encoded(encoded: bytes) -> Any:
+    return sanitize_schema(fastjson.loads(encoded), _copy=False)
+
+
+def sanitize_schema(schema: Any, _copy: bool = True) -> Any:
+    """Strip JSON Schema keys rejected by Gemini API.
 
     Handles:
     - Removes: const, $ref, $defs, default, examples, title
@@ -151,56 +248,63 @@ def sanitize_schema(schema: Any) -> Any:
     - Flattens single-item ``anyOf`` / ``oneOf`` (unwraps the inner schema)
     - Merges ``allOf`` items into one schema
     - Multi-item ``anyOf`` / ``oneOf``: takes the first branch (lossy but functional)
+
+    The schema is copied once and then cleaned in place with an explicit
+    stack; ``_copy=False`` is for callers that already own a private copy.
     """
     if not isinstance(schema, dict):
         return schema
+    if _copy:
+        # A JSON round-trip is several times faster than deepcopy.
+        try:
+            schema = fastjson.loads(fastjson.dumps(schema))
+        except (TypeError, ValueError):
+            schema = copy.deepcopy(schema)
+
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        # Most nodes carry none of these keys; one set test rules them out.
+        if not _STRIPPED_SCHEMA_KEYS.isdisjoint(node):
+            # Composition is resolved first so the merged keys are cleaned too.
+            if not COMPOSITION_SCHEMA_KEYS.isdisjoint(node):
+                _resolve_composition(node)
+            for key in _STRIPPED_SCHEMA_KEYS.intersection(node):
+                value = node.pop(key)
+                if key == "const":
+                    node["enum"] = [value]
+        for value in node.values():
+            # Exact type checks: the working copy is plain JSON containers.
+            if type(value) is dict:
+                stack.append(value)
+            elif type(value) is list:
+                for item in value:
+                    if type(item) is dict:
+                        stack.append(item)
 
-    # ── Handle composition keywords first ──────────────────────────────
-    # Process them before the main loop so the result replaces the
-    # original schema dict entirely when appropriate.
-    schema = _resolve_composition(schema)
-
-    result: dict[str, Any] = {}
-    for key, value in schema.items():
-        if key in REJECTED_SCHEMA_KEYS:
-            if key == "const":
-                result["enum"] = [value]
-            continue
-
-        # Skip composition keys — already resolved above
-        if key in COMPOSITION_SCHEMA_KEYS:
-            continue
-
-        if isinstance(value, dict):
-            result[key] = sanitize_schema(value)
-        elif isinstance(value, list):
-            result[key] = [
-                sanitize_schema(item) if isinstance(item, dict) else item for item in value
-            ]
-        else:
-            result[key] = value
-
-    return result
+    return schema
 
 
-def _resolve_composition(schema: dict[str, Any]) -> dict[str, Any]:
-    """Resolve anyOf/oneOf/allOf into a flat schema Gemini can accept."""
+def _resolve_composition(schema: dict[str, Any]) -> None:
+    """Resolve anyOf/oneOf/allOf in place into a flat schema Gemini can accept."""
 
     # ── allOf: merge all sub-schemas ───────────────────────────────────
     if "allOf" in schema:
         items = schema["allOf"]
         if isinstance(items, list) and items:
-            merged = {k: v for k, v in schema.items() if k != "allOf"}
+            del schema["allOf"]
             for sub in items:
-                if isinstance(sub, dict):
-                    for k, v in sub.items():
-                        if k == "properties" and k in merged:
-                            merged[k] = {**merged[k], **v}
-                        elif k == "required" and k in merged:
-                            merged[k] = list(dict.fromkeys(merged[k] + v))
-                        else:
-                            merged[k] = v
-            return merged
+                if type(sub) is not dict:
+                    continue
+                for k, v in sub.items():
+                    if k == "properties" and k in schema:
+                        # Safe to grow in place: the node owns this dict.
+                        schema[k].update(v)
+                    elif k == "required" and k in schema:
+                        schema[k] = list(dict.fromkeys(itertools.chain(schema[k], v)))
+                    else:
+                        schema[k] = v
+            return
 
     # ── anyOf / oneOf: unwrap single-item, else take first branch ──────
     for key in ("anyOf", "oneOf"):
@@ -211,12 +315,11 @@ def _resolve_composition(schema: dict[str, Any]) -> dict[str, Any]:
                 non_null = [s for s in items if isinstance(s, dict) and s.get("type") != "null"]
                 chosen = non_null[0] if non_null else items[0]
                 if isinstance(chosen, dict):
-                    # Preserve any sibling keys (description, etc.)
-                    base = {k: v for k, v in schema.items() if k not in COMPOSITION_SCHEMA_KEYS}
-                    base.update(chosen)
-                    return base
-
-    return schema
+                    # Sibling keys (description, etc.) stay in place
+                    for k in COMPOSITION_SCHEMA_KEYS:
+                        schema.pop(k, None)
+                    schema.update(chosen)
+                    return
 
 
 def _unwrap_response(data: dict[str, Any]) -> dict[str, Any]:
@@ -229,9 +332,8 @@ def _unwrap_response(data: dict[str, Any]) -> dict[str, Any]:
     This helper returns the inner ``response`` dict, or the original dict if
     it already contains ``candidates`` directly.
     """
-    if "response" in data and isinstance(data["response"], dict):
-        return data["response"]
-    return data
+    inner = data.get("response")
+    return inner if isinstance(inner, dict) else data
 
 
 def parse_gemini_response(
@@ -272,13 +374,19 @@ def parse_gemini_response(
             fc = part["functionCall"]
             tool_calls.append(
                 ToolCallRequest(
-                    id=f"ag_{uuid.uuid4().hex[:12]}",
+                    id=_make_id("ag"),
                     name=fc["name"],
                     arguments=fc.get("args", {}),
                 )
             )
 
-    content = "\n".join(content_parts) if content_parts else None
+    # Most candidates carry a single text part; skip the join for it.
+    if not content_parts:
+        content = None
+    elif len(content_parts) == 1:
+        content = content_parts[0]
+    else:
+        content = "\n".join(content_parts)
 
     # Parse usage
     usage: dict[str, int] = {}
@@ -301,26 +409,24 @@ def parse_gemini_response(
 
 def _map_finish_reason(gemini_reason: str) -> str:
     """Map Gemini finish reason to OpenAI-compatible string."""
-    mapping = {
-        "STOP": "stop",
-        "MAX_TOKENS": "length",
-        "SAFETY": "content_filter",
-        "RECITATION": "content_filter",
-        "FINISH_REASON_UNSPECIFIED": "stop",
-    }
-    return mapping.get(gemini_reason, "stop")
+    return _FINISH_REASON_MAP.get(gemini_reason, "stop")
 
 
 def parse_sse_chunk(
-    event_data: dict[str, Any],
+    event_data: dict[str, Any] | bytes,
 ) -> dict[str, Any]:
     """Parse a single SSE event (Gemini streaming response) into stream chunk components.
 
+    Accepts the decoded event or its raw ``data:`` payload; raises
+    ``ValueError`` if the payload is not valid JSON.
+
     Returns dict with: content_delta, tool_calls_delta, reasoning_delta,
     finish_reason, usage.
     """
+    if isinstance(event_data, bytes):
+        event_data = fastjson.loads(event_data)
     event_data = _unwrap_response(event_data)
-    candidates = event_data.get("candidates", [])
+    candidates = event_data.get("candidates")
     content_delta: str | None = None
     tool_calls_delta: list[ToolCallDelta] = []
     reasoning_delta: str | None = None
@@ -328,9 +434,12 @@ def parse_sse_chunk(
 
     if candidates:
         candidate = candidates[0]
-        parts = candidate.get("content", {}).get("parts", [])
+        content = candidate.get("content")
+        parts = content.get("parts") if content else None
 
-        for part in parts:
+        # Gemini streams one text part per event; if several arrive, the
+        # last one wins.
+        for part in parts or ():
             if "text" in part:
                 if part.get("thought"):
                     reasoning_delta = part["text"]
@@ -340,19 +449,19 @@ def parse_sse_chunk(
                 fc = part["functionCall"]
                 tool_calls_delta.append(
                     ToolCallDelta(
-                        id=f"ag_{uuid.uuid4().hex[:12]}",
+                        id=_make_id("ag"),
                         name=fc.get("name"),
-                        arguments_json=json.dumps(fc.get("args", {})),
+                        arguments_json=fastjson.dumps(fc.get("args", {})).decode(),
                     )
                 )
 
         raw_reason = candidate.get("finishReason")
         if raw_reason:
-            finish_reason = _map_finish_reason(raw_reason)
+            finish_reason = _FINISH_REASON_MAP.get(raw_reason, "stop")
 
     # Parse usage from final chunk
     usage: dict[str, int] = {}
-    usage_meta = event_data.get("usageMetadata", {})
+    usage_meta = event_data.get("usageMetadata")
     if usage_meta:
         usage = {
             "prompt_tokens": usage_meta.get("promptTokenCount", 0),
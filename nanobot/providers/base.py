@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallRequest:
     """A tool call request from the LLM."""
 
@@ -15,7 +15,7 @@ class ToolCallRequest:
     arguments: dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallDelta:
     """Incremental tool call data from a streaming response."""
 
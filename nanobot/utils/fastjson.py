@@ -0,0 +1,40 @@
+"""JSON encode/decode helpers that use orjson when it is installed."""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if ORJSON_AVAILABLE:
+
+    def loads(data: bytes | str) -> Any:
+        """Parse a JSON document from bytes or str."""
+        return orjson.loads(data)
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to UTF-8 JSON bytes, with 2-space indentation if requested."""
+        option = orjson.OPT_INDENT_2 if indent else 0
+        try:
+            return orjson.dumps(obj, option=option)
+        except TypeError:
+            # Non-str dict keys: stringify them like json.dumps does.  Only on
+            # retry, since OPT_NON_STR_KEYS slows down every dict.
+            return orjson.dumps(obj, option=option | orjson.OPT_NON_STR_KEYS)
+
+else:
+
+    def loads(data: bytes | str) -> Any:
+        """Parse a JSON document from bytes or str."""
+        return json.loads(data)
+
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """Serialize to UTF-8 JSON bytes, with 2-space indentation if requested."""
+        if indent:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode()
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
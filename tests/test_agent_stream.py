@@ -0,0 +1,86 @@
+import pytest
+
+from nanobot.agent.loop import AgentLoop
+from nanobot.bus.queue import MessageBus
+from nanobot.providers.base import LLMProvider, LLMResponse, LLMStreamChunk, ToolCallDelta
+
+
+class StreamingProvider(LLMProvider):
+    """Streams one tool call, then a text answer in three chunks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def chat(self, *args, **kwargs) -> LLMResponse:
+        raise AssertionError("chat() should not be used when streaming works")
+
+    async def stream_chat(self, messages, tools=None, model=None, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            yield LLMStreamChunk(
+                tool_calls_delta=[
+                    ToolCallDelta(id="call_1", name="list_dir", arguments_json='{"path": "."}')
+                ],
+                finish_reason="stop",
+            )
+            return
+        for text in ("Hel", "lo ", "world"):
+            yield LLMStreamChunk(content_delta=text)
+        yield LLMStreamChunk(finish_reason="stop", usage={"total_tokens": 3})
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+class PlainProvider(LLMProvider):
+    """Provider without streaming support."""
+
+    async def chat(self, *args, **kwargs) -> LLMResponse:
+        return LLMResponse(content="plain answer")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+class FailingStreamProvider(LLMProvider):
+    """Streams some text, then fails mid-response."""
+
+    async def chat(self, *args, **kwargs) -> LLMResponse:
+        raise AssertionError("a failed stream must not be retried with chat()")
+
+    async def stream_chat(self, messages, tools=None, model=None, **kwargs):
+        yield LLMStreamChunk(content_delta="Partial")
+        raise RuntimeError("connection reset")
+
+    def get_default_model(self) -> str:
+        return "test-model"
+
+
+@pytest.mark.asyncio
+async def test_stream_direct_yields_deltas_across_tool_iterations(tmp_path) -> None:
+    provider = StreamingProvider()
+    loop = AgentLoop(bus=MessageBus(), provider=provider, workspace=tmp_path)
+
+    chunks = [c async for c in loop.stream_direct("hi", session_key="cli:test")]
+
+    assert chunks == ["Hel", "lo ", "world"]
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_direct_falls_back_to_chat(tmp_path) -> None:
+    loop = AgentLoop(bus=MessageBus(), provider=PlainProvider(), workspace=tmp_path)
+
+    chunks = [c async for c in loop.stream_direct("hi", session_key="cli:test")]
+
+    assert chunks == ["plain answer"]
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_becomes_error_response(tmp_path) -> None:
+    loop = AgentLoop(bus=MessageBus(), provider=FailingStreamProvider(), workspace=tmp_path)
+
+    chunks = [c async for c in loop.stream_direct("hi", session_key="cli:test")]
+
+    assert chunks == ["Partial", "\nError calling LLM: connection reset"]
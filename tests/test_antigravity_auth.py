@@ -0,0 +1,113 @@
+import asyncio
+import base64
+import json
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+
+from nanobot.providers.antigravity.auth import (
+    AntigravityAuthManager,
+    AntigravityCredentials,
+    _id_token_email,
+    _wait_for_callback,
+)
+
+
+def _manager(tmp_path, *emails: str) -> AntigravityAuthManager:
+    auth = AntigravityAuthManager(credentials_dir=tmp_path)
+    for email in emails:
+        auth._accounts[email] = AntigravityCredentials("tok", "ref", time.time() + 3600, email)
+    if emails:
+        auth._active_email = emails[0]
+        auth._save()
+    return auth
+
+
+def _stored(tmp_path) -> dict:
+    return json.loads((tmp_path / "credentials.json").read_text())
+
+
+def test_batch_defers_writes_until_exit(tmp_path) -> None:
+    auth = _manager(tmp_path, "a@x.com", "b@x.com")
+
+    with auth.batch():
+        assert auth.switch("b@x.com")
+        assert _stored(tmp_path)["active"] == "a@x.com"
+
+    assert _stored(tmp_path)["active"] == "b@x.com"
+
+
+def test_logout_many_switches_to_remaining_account(tmp_path) -> None:
+    auth = _manager(tmp_path, "a@x.com", "b@x.com", "c@x.com")
+
+    auth.logout_many(["a@x.com", "b@x.com"])
+
+    assert auth.accounts == ["c@x.com"]
+    assert _stored(tmp_path) == {
+        "active": "c@x.com",
+        "accounts": {"c@x.com": auth.active_credentials.to_dict()},
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_get_valid_token_refreshes_once(tmp_path) -> None:
+    auth = _manager(tmp_path, "a@x.com")
+    auth.active_credentials.expires_at = 0
+    calls = 0
+
+    async def fake_refresh() -> None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        auth.active_credentials.access_token = "fresh"
+        auth.active_credentials.expires_at = time.time() + 3600
+
+    auth._refresh = fake_refresh
+    tokens = await asyncio.gather(*(auth.get_valid_token() for _ in range(5)))
+
+    assert tokens == ["fresh"] * 5
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_refreshed_token_is_saved_without_debounce(tmp_path) -> None:
+    auth = _manager(tmp_path, "a@x.com")  # just saved: a plain change would be deferred
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"access_token": "fresh", "expires_in": 60})
+        )
+    )
+    auth._get_client = lambda: client
+
+    await auth._refresh()
+
+    assert _stored(tmp_path)["accounts"]["a@x.com"]["access_token"] == "fresh"
+
+
+def test_callback_server_ignores_stray_requests() -> None:
+    server = socket.create_server(("localhost", 0))
+    server.setblocking(False)
+    base = f"http://localhost:{server.getsockname()[1]}"
+    result = {}
+    waiter = threading.Thread(
+        target=lambda: result.update(r=_wait_for_callback(server, "s1", timeout=5))
+    )
+    waiter.start()
+
+    assert httpx.get(f"{base}/favicon.ico").status_code == 404
+    assert httpx.get(f"{base}/oauth-callback?code=abc&state=s1").status_code == 200
+    waiter.join()
+    server.close()
+
+    assert result["r"] == ("abc", None)
+
+
+def test_id_token_email() -> None:
+    payload = base64.urlsafe_b64encode(b'{"email":"a@x.com"}').rstrip(b"=").decode()
+
+    assert _id_token_email(f"header.{payload}.sig") == "a@x.com"
+    assert _id_token_email("") == ""
+    assert _id_token_email("header.not-base64!.sig") == ""
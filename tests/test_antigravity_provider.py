@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from nanobot.providers.antigravity._http import LoopClients
+from nanobot.providers.antigravity.provider import AntigravityProvider, _sse_data
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("size", [1, 5, 1024])
+async def test_sse_data_splits_across_chunk_boundaries(size: int) -> None:
+    raw = b'data: {"a":1}\r\n\r\n: keep-alive\ndata: {"b":2}\n\nevent: end\ndata: [DONE]'
+
+    payloads = [p async for p in _sse_data(_chunks(raw, size))]
+
+    assert payloads == [b'{"a":1}', b'{"b":2}', b"[DONE]"]
+
+
+@pytest.mark.parametrize(
+    ("model", "expected"),
+    [
+        ("claude-sonnet-4-5", "claude-sonnet-4-5"),
+        ("Anthropic/claude-opus-4-5", "claude-opus-4-6-thinking"),
+        (" openai/antigravity-gemini-3-pro ", "gemini-3-pro-low"),
+        ("gemini-3-pro-PREVIEW", "gemini-3-pro-low"),
+        ("ANTIGRAVITY-gemini-3-pro-high", "gemini-3-pro-high"),
+        ("openrouter/google/gemini-3-pro", "google/gemini-3-pro"),
+    ],
+)
+def test_resolve_model(model: str, expected: str) -> None:
+    assert AntigravityProvider._resolve_model(model) == expected
+
+
+def test_retry_delay_accepts_http_date() -> None:
+    when = datetime.now(timezone.utc) + timedelta(seconds=20)
+    response = httpx.Response(429, headers={"Retry-After": format_datetime(when, usegmt=True)})
+
+    assert 15.0 <= AntigravityProvider._get_retry_delay(response, 0) <= 21.0
+
+
+def test_loop_clients_drop_clients_of_closed_loops() -> None:
+    clients = LoopClients(httpx.AsyncClient)
+
+    async def get() -> httpx.AsyncClient:
+        return clients.get()
+
+    first = asyncio.run(get())
+    second = asyncio.run(get())
+
+    assert first is not second
+    assert len(clients) == 1
+
+
+@pytest.mark.asyncio
+async def test_prewarm_opens_fallback_during_backoff(monkeypatch) -> None:
+    provider = AntigravityProvider(auth_manager=object(), prewarm_fallbacks=True)
+    primary, fallback = provider._endpoint_order[:2]
+    seen: list[tuple[str, str]] = []
+    statuses = iter([429, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.method, f"{request.url.scheme}://{request.url.host}"))
+        if request.method == "HEAD":
+            return httpx.Response(200)
+        return httpx.Response(next(statuses))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(provider, "_get_client", lambda: asyncio.sleep(0, client))
+    monkeypatch.setattr(provider, "_get_retry_delay", lambda response, attempt: 0.01)
+
+    response = await provider._request_with_retry({}, "token")
+    await asyncio.gather(*provider._background)
+
+    assert response.status_code == 200
+    assert ("HEAD", fallback) in seen
+    assert [url for method, url in seen if method == "POST"] == [primary, primary]
@@ -0,0 +1,27 @@
+import json
+import os
+
+import pytest
+
+from nanobot.cron.service import CronService
+from nanobot.cron.types import CronSchedule
+
+
+@pytest.mark.asyncio
+async def test_job_state_survives_reload_during_run(tmp_path) -> None:
+    store_path = tmp_path / "jobs.json"
+    service = CronService(store_path)
+    job = service.add_job("ping", CronSchedule(kind="every", every_ms=60_000), "ping")
+
+    async def on_job(running) -> None:
+        # Another process (e.g. `nanobot cron add`) edits jobs.json mid-run.
+        CronService(store_path).add_job("other", CronSchedule(kind="every", every_ms=1000), "x")
+        st = store_path.stat()
+        os.utime(store_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    service.on_job = on_job
+    assert await service.run_job(job.id)
+
+    saved = {j["name"]: j for j in json.loads(store_path.read_text())["jobs"]}
+    assert set(saved) == {"ping", "other"}
+    assert saved["ping"]["state"]["lastStatus"] == "ok"
@@ -0,0 +1,145 @@
+import pytest
+
+from nanobot.metrics import collector as collector_module
+from nanobot.metrics.collector import MetricsCollector, ts_epoch
+from nanobot.metrics.models import ToolEvent
+
+
+def _tool_event(name: str) -> ToolEvent:
+    return ToolEvent(
+        ts="2026-01-01T00:00:00",
+        session_id="s1",
+        tool_name=name,
+        tool_success=True,
+        latency_ms=5,
+        input_size=10,
+        output_size=20,
+    )
+
+
+def test_read_reuses_parse_until_file_changes(tmp_path, monkeypatch) -> None:
+    collector = MetricsCollector(tmp_path)
+    collector.record_tool_event(_tool_event("read_file"))
+
+    parses = 0
+    original = MetricsCollector._decode
+
+    def counting_decode(data, limit=0):
+        nonlocal parses
+        parses += 1
+        return original(data, limit)
+
+    monkeypatch.setattr(MetricsCollector, "_decode", staticmethod(counting_decode))
+
+    assert [e["tool_name"] for e in collector.read_tool_events()] == ["read_file"]
+    assert [e["tool_name"] for e in collector.read_tool_events()] == ["read_file"]
+    assert parses == 1
+
+    collector.record_tool_event(_tool_event("exec"))
+
+    assert [e["tool_name"] for e in collector.read_tool_events()] == ["read_file", "exec"]
+    assert parses == 2
+
+
+def test_read_with_limit_returns_the_tail(tmp_path) -> None:
+    collector = MetricsCollector(tmp_path)
+    for i in range(50):
+        collector.record_tool_event(_tool_event(f"tool_{i}"))
+
+    tail = collector.read_tool_events(limit=3)
+
+    assert [e["tool_name"] for e in tail] == ["tool_47", "tool_48", "tool_49"]
+    assert collector.read_tool_events(limit=60) == collector.read_tool_events()
+
+
+def test_legacy_jsonl_is_migrated(tmp_path) -> None:
+    (tmp_path / "sessions.jsonl").write_text('{"session_id": "old", "success": true}\n')
+
+    collector = MetricsCollector(tmp_path)
+
+    assert not (tmp_path / "sessions.jsonl").exists()
+    assert collector.read_sessions() == [{"session_id": "old", "success": True}]
+
+
+def test_appends_are_buffered_until_flush(tmp_path, monkeypatch) -> None:
+    # Keep the background flusher asleep so only flush() writes.
+    monkeypatch.setattr(collector_module, "FLUSH_INTERVAL", 3600.0)
+    collector = MetricsCollector(tmp_path)
+    collector.record_tool_event(_tool_event("read_file"))
+    collector.record_tool_event(_tool_event("exec"))
+
+    assert not list((tmp_path / "tool_events").iterdir())
+
+    collector.flush()
+
+    assert [e["tool_name"] for e in collector.read_tool_events()] == ["read_file", "exec"]
+
+
+def test_iter_tool_events_starts_at_cutoff(tmp_path) -> None:
+    collector = MetricsCollector(tmp_path)
+    for ts, name in (("2026-01-01T00:00:00", "old"), ("2026-01-02T00:00:00", "new")):
+        event = _tool_event(name)
+        event.ts = ts
+        collector.record_tool_event(event)
+
+    cutoff = ts_epoch("2026-01-01T12:00:00")
+
+    collector.flush()
+    assert sorted(p.name for p in (tmp_path / "tool_events").iterdir()) == [
+        "2026-01-01.msgpack",
+        "2026-01-02.msgpack",
+    ]
+    assert [e["tool_name"] for e in collector.iter_tool_events()] == ["old", "new"]
+    assert [e["tool_name"] for e in collector.iter_tool_events(since=cutoff)] == ["new"]
+
+
+def test_iter_tool_events_typed_yields_records(tmp_path) -> None:
+    collector = MetricsCollector(tmp_path)
+    event = _tool_event("exec")
+    collector.record_tool_event(event)
+
+    assert list(collector.iter_tool_events_typed()) == [event]
+
+
+def test_aggregate_sampling_keeps_per_tool_totals(tmp_path) -> None:
+    collector = MetricsCollector(tmp_path, sampling="aggregate")
+    for ok in (True, False, True):
+        event = _tool_event("exec")
+        event.tool_success = ok
+        event.error = None if ok else "boom"
+        collector.record_tool_event(event)
+
+    assert collector.read_tool_events() == []
+    assert collector.read_tool_stats() == {"exec": [3, 2, 15, 30, 60, {"boom": 1}]}
+
+    # A new collector continues from the day's snapshot.
+    collector = MetricsCollector(tmp_path, sampling="aggregate")
+    collector.record_tool_event(_tool_event("exec"))
+    assert collector.read_tool_stats()["exec"][:2] == [4, 3]
+
+
+def test_reservoir_sampling_scales_to_events_seen(tmp_path) -> None:
+    collector = MetricsCollector(tmp_path, sampling="reservoir:2")
+    for _ in range(10):
+        collector.record_tool_event(_tool_event("exec"))
+
+    calls, ok, latency, *_ = collector.read_tool_stats()["exec"]
+
+    assert (calls, ok, latency) == (10, 10, 50)
+
+
+def test_sampled_snapshots_from_two_collectors_add_up(tmp_path) -> None:
+    first = MetricsCollector(tmp_path, sampling="aggregate")
+    second = MetricsCollector(tmp_path, sampling="aggregate")
+    first.record_tool_event(_tool_event("exec"))
+    second.record_tool_event(_tool_event("exec"))
+    second.flush()
+    first.flush()
+
+    assert second.read_tool_stats()["exec"][:2] == [2, 2]
+
+
+def test_reservoir_size_must_be_positive(tmp_path) -> None:
+    for sampling in ("reservoir:0", "reservoir:-1"):
+        with pytest.raises(ValueError):
+            MetricsCollector(tmp_path, sampling=sampling)